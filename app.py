@@ -110,6 +110,7 @@ with st.sidebar:
     st.page_link("pages/1_Carte.py", label="🗺️ Carte", icon=None)
     st.page_link("pages/2_Analyses.py", label="📈 Analyses", icon=None)
     st.page_link("pages/3_Comparaison.py", label="🔄 Comparaison", icon=None)
+    st.page_link("pages/4_Station.py", label="📍 Station", icon=None)
 
 # =====================
 # CONTENU PRINCIPAL
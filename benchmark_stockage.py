@@ -0,0 +1,71 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import stockage
+from utils.donnees import DATA_PATH
+
+# =====================
+# BANC D'ESSAI DU STOCKAGE DU FICHIER NETTOYÉ
+# =====================
+# Usage : python benchmark_stockage.py [--remplacer]
+# Réécrit data/clean/meteo_clean.parquet avec les encodages de
+# utils/stockage.py dans un dossier temporaire, puis compare taille,
+# temps de chargement à froid et écart des mesures. Avec --remplacer, le
+# fichier réécrit remplace l'original (les tables dérivées seront
+# reconstruites, leur source étant plus récente).
+REPETITIONS = 5
+
+
+def chronometrer(lecture):
+    """Médiane des temps de ``lecture()`` (s) et dernier résultat."""
+    temps = []
+    for _ in range(REPETITIONS):
+        debut = time.perf_counter()
+        resultat = lecture()
+        temps.append(time.perf_counter() - debut)
+    return float(np.median(temps)), resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare le fichier nettoyé actuel et sa version réencodée")
+    parser.add_argument("--remplacer", action="store_true", help="remplacer le fichier nettoyé par la version réencodée")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "meteo_clean.parquet")
+        t_actuel, df = chronometrer(lambda: pd.read_parquet(DATA_PATH))
+        stockage.ecrire(df, chemin)
+        t_nouveau, df_nouveau = chronometrer(lambda: stockage.lire(chemin))
+
+        taille, taille_nouveau = os.path.getsize(DATA_PATH), os.path.getsize(chemin)
+        print(f"{'':14}{'actuel':>12}{'réencodé':>12}")
+        print(f"{'taille (Mo)':14}{taille / 1e6:>12.2f}{taille_nouveau / 1e6:>12.2f}   ({taille_nouveau / taille:.0%})")
+        print(f"{'lecture (ms)':14}{t_actuel * 1e3:>12.1f}{t_nouveau * 1e3:>12.1f}   ({t_nouveau / t_actuel:.0%})")
+
+        # Même contenu, à l'ordre des lignes et à la quantification près
+        cles = ["NUM_POSTE", "date"]
+        a = df.sort_values(cles, ignore_index=True)
+        b = df_nouveau.sort_values(cles, ignore_index=True)
+        assert a.columns.equals(b.columns) and len(a) == len(b)
+        print("\nécart max des mesures (demi-pas de quantification attendu) :")
+        for colonne, facteur in stockage.QUANTIFICATION.items():
+            ecart = np.nanmax(np.abs(a[colonne].to_numpy() - b[colonne].to_numpy()))
+            print(f"  {colonne:5} {ecart:.4f}  (pas {1 / facteur:g})")
+            assert ecart <= 0.5 / facteur + 1e-9, colonne
+        autres = [c for c in a.columns if c not in stockage.QUANTIFICATION]
+        pd.testing.assert_frame_equal(a[autres], b[autres], check_dtype=False)
+        print("✅ Autres colonnes identiques")
+
+        if args.remplacer:
+            shutil.copyfile(chemin, DATA_PATH)
+            print(f"💾 {DATA_PATH} remplacé")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import argparse
+
+from utils import donnees
+
+# =====================
+# PRÉ-CALCUL DES TABLES DÉRIVÉES (data/derived)
+# =====================
+# Usage : python build_data.py [etape ...]   (sans argument : toutes les étapes)
+ETAPES = {
+    "geometries": donnees.construire_geometries,
+    "departements": donnees.construire_departements,
+    "qualite": donnees.construire_qualite,
+    "normales": donnees.construire_normales,
+    "evenements": donnees.mettre_a_jour_evenements,
+    "zonage": donnees.construire_zonage,
+    "agregats": donnees.construire_agregats_departements,
+    "esquisses": donnees.construire_esquisses,
+    "tuiles": donnees.construire_tuiles,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-calcul des tables dérivées du dashboard")
+    parser.add_argument("etapes", nargs="*", help=f"étapes à exécuter parmi : {', '.join(ETAPES)}")
+    args = parser.parse_args()
+    inconnues = set(args.etapes) - set(ETAPES)
+    if inconnues:
+        parser.error(f"étape(s) inconnue(s) : {', '.join(sorted(inconnues))}")
+
+    df = donnees.lire_donnees()
+    for nom in args.etapes or ETAPES:
+        print(f"⚙️  {nom}...")
+        ETAPES[nom](df)
+    print("✅ Terminé")
+
+
+if __name__ == "__main__":
+    main()
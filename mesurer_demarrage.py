@@ -0,0 +1,67 @@
+import ast
+import glob
+import subprocess
+import sys
+
+# =====================
+# BUDGET DE DÉMARRAGE PAR PAGE
+# =====================
+# Usage : python mesurer_demarrage.py
+# Pour chaque page, exécute ses imports de premier niveau dans un
+# interpréteur neuf (Streamlit déjà chargé, comme dans un worker) et
+# mesure leur durée ainsi que les bibliothèques lourdes chargées. Code
+# de sortie 1 si une page dépasse son budget.
+REPETITIONS = 3
+BUDGETS = {                 # secondes d'import au-delà de Streamlit
+    "app.py": 0.1,
+    "pages/1_Carte.py": 0.8,            # folium / streamlit_folium : carte dès le haut de page
+    "pages/2_Analyses.py": 0.35,        # pandas + modules du projet, sans bibliothèque géographique
+    "pages/3_Comparaison.py": 0.35,
+    "pages/4_Station.py": 0.35,
+}
+LOURDES = ["geopandas", "pyproj", "shapely", "scipy", "folium", "streamlit_folium", "plotly.graph_objects"]
+
+_MESURE = """
+import sys, time, warnings
+warnings.filterwarnings("ignore")
+import streamlit
+debut = time.perf_counter()
+exec(compile(sys.stdin.read(), "imports", "exec"))
+print(time.perf_counter() - debut)
+print(",".join(m for m in sys.argv[1:] if m in sys.modules))
+"""
+
+
+def imports_page(chemin):
+    """Instructions d'import de premier niveau d'une page."""
+    with open(chemin, encoding="utf-8") as f:
+        arbre = ast.parse(f.read())
+    return "\n".join(ast.unparse(n) for n in arbre.body if isinstance(n, (ast.Import, ast.ImportFrom)))
+
+
+def mesurer(chemin):
+    """(durée médiane des imports en s, bibliothèques lourdes chargées)."""
+    code = imports_page(chemin)
+    durees = []
+    for _ in range(REPETITIONS):
+        sortie = subprocess.run(
+            [sys.executable, "-c", _MESURE, *LOURDES],
+            input=code, capture_output=True, text=True, check=True,
+        ).stdout.splitlines()
+        durees.append(float(sortie[-2]))
+    return sorted(durees)[len(durees) // 2], [m for m in sortie[-1].split(",") if m]
+
+
+def main():
+    depasse = False
+    for chemin in ["app.py", *sorted(glob.glob("pages/*.py"))]:
+        duree, lourdes = mesurer(chemin)
+        budget = BUDGETS.get(chemin, min(BUDGETS.values()))
+        ok = duree <= budget
+        depasse |= not ok
+        print(f"{'✅' if ok else '❌'} {chemin:24} {duree:6.2f} s / {budget:.2f} s   {', '.join(lourdes) or '-'}")
+    sys.exit(1 if depasse else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,25 @@
 import streamlit as st
-import pandas as pd
-import geopandas as gpd
+import numpy as np
 import folium
-from folium.plugins import MarkerCluster, HeatMap
+from branca.colormap import LinearColormap
+from folium.plugins import MarkerCluster, HeatMap, HeatMapWithTime, VectorGridProtobuf
 from streamlit_folium import st_folium
 
+from utils import evenements
+from utils.animation import donnees_heatmap
+from utils.carte import afficher_carte, charger_plugins, couche_choroplethe
+from utils.climatologie import anomalies
+from utils.donnees import (
+    load_data, load_shp, load_shp_simplifie, load_normales, load_evenements, load_index_spatial, load_zonage,
+    load_departements, load_emprises_departements, load_agregats_departements, load_frames
+)
+from utils.export import boutons_export
+from utils.filtres import case_completes, etat_filtres, memoise, tranche, widget_filtre
+from utils.indicateurs import kpis
+from utils.index_spatial import emprise_elargie, tolerance_pour_zoom
+from utils.tuiles import TILES_URL, options_vectorgrid
+from utils.zonage import TOUS_MOIS, agreger, agregats_par_zone
+
 # =====================
 # CONFIGURATION PAGE & CSS
 # =====================
@@ -170,21 +185,18 @@ st.markdown("""
 # =====================
 # CHARGEMENT DONNÉES
 # =====================
-@st.cache_data
-def load_data():
-    df = pd.read_parquet("data/clean/meteo_clean.parquet")
-    df["date"] = pd.to_datetime(df["date"])
-    return df
-
-@st.cache_data
-def load_shp():
-    gdf = gpd.read_file("data/SHP_meteo.shp")
-    if gdf.crs != "EPSG:4326":
-        gdf = gdf.to_crs(epsg=4326)
-    return gdf
-
-df = load_data()
+# Manifeste : seules ces colonnes sont lues (les autres, au clic d'export)
+COLONNES = ("NUM_POSTE", "date", "DEPARTEMENT", "NOM_USUEL", "LAT", "LON",
+            "T", "RR1", "U", "FF", "PMER", "annee", "mois")
+df = load_data(COLONNES)
 gdf_dept = load_shp()
+normales = load_normales()
+index_evenements = load_evenements()
+index_spatial = load_index_spatial()
+zonage = load_zonage()
+gdf_departements = load_departements()
+emprises_departements = load_emprises_departements()
+agregats_departements = load_agregats_departements()
 
 # Dictionnaire pour mapper les numéros aux noms de mois (global)
 noms_mois = {
@@ -193,6 +205,16 @@ noms_mois = {
     9: "🍂 Septembre", 10: "🍁 Octobre", 11: "🌧️ Novembre", 12: "⛄ Décembre"
 }
 
+# Variables de la couche choroplèthe (table d'agrégats par département)
+CHOROPLETHES = {
+    "T": {"label": "🌡️ Température moyenne", "unite": "°C",
+          "couleurs": ["#3a7bd5", "#00d2ff", "#ffd700", "#ff6b35", "#ff0000"]},
+    "RR1": {"label": "🌧️ Cumul de précipitations / station", "unite": "mm",
+            "couleurs": ["#e0f7fa", "#4dd0e1", "#0097a7", "#006064", "#1a237e"]},
+    "U": {"label": "💧 Humidité moyenne", "unite": "%",
+          "couleurs": ["#f5f0e1", "#a8dadc", "#457b9d", "#1d3557"]},
+}
+
 # =====================
 # SIDEBAR (Filtres déportés pour libérer l'espace)
 # =====================
@@ -216,30 +238,55 @@ with st.sidebar:
     st.page_link("pages/1_Carte.py", label="🗺️ Carte")
     st.page_link("pages/2_Analyses.py", label="📈 Analyses")
     st.page_link("pages/3_Comparaison.py", label="🔄 Comparaison")
+    st.page_link("pages/4_Station.py", label="📍 Station")
     
     st.markdown("---")
     
+    # Filtres partagés avec les autres pages (session_state)
+    filtres = etat_filtres(df)
+
     st.markdown("### 📅 Période d'analyse")
-    selected_year = st.select_slider(
-        "Année",
-        options=sorted(df["annee"].unique().astype(int)),
-        value=int(df["annee"].min())
+    selected_year = widget_filtre(
+        st.select_slider, filtres, "annee", "Année",
+        options=sorted(df["annee"].unique().astype(int))
     )
 
-    month = st.selectbox(
-        "Mois",
-        options=["Tous"] + list(range(1, 13)),
-        index=0,
+    options_mois = ["Tous"] + list(range(1, 13))
+    month = widget_filtre(
+        st.selectbox, filtres, "mois", "Mois",
+        options=options_mois,
         format_func=lambda x: "📆 Tous les mois" if x == "Tous" else noms_mois.get(x, str(x))
     )
 
     st.markdown("---")
     st.markdown("### 🗺️ Zone géographique")
-    selected_dep = st.selectbox(
-        "Département",
-        ["Tous"] + sorted(df["DEPARTEMENT"].dropna().unique()),
+    options_dep = ["Tous"] + sorted(df["DEPARTEMENT"].dropna().unique())
+    selected_dep = widget_filtre(
+        st.selectbox, filtres, "departement", "Département",
+        options=options_dep,
         format_func=lambda x: "🌍 Tous les départements" if x == "Tous" else f"📍 {x}"
     )
+    completes = case_completes(filtres)
+
+    st.markdown("---")
+    st.markdown("### 🎨 Choroplèthe")
+    variable_choro = st.selectbox(
+        "Colorer les départements par",
+        options=["Aucune"] + list(CHOROPLETHES),
+        format_func=lambda x: "➖ Aucune" if x == "Aucune" else CHOROPLETHES[x]["label"]
+    )
+
+    mode_viewport = st.toggle(
+        "🔭 Mode viewport",
+        value=False,
+        help="N'envoie au navigateur que les stations et contours de la vue courante"
+    )
+
+    tuiles_vectorielles = st.toggle(
+        "🧩 Tuiles vectorielles",
+        value=False,
+        help="Contours et stations chargés tuile par tuile depuis le serveur local (python serveur_tuiles.py)"
+    )
     
     st.markdown("---")
     st.markdown("""
@@ -259,15 +306,12 @@ with st.sidebar:
 # =====================
 # LOGIQUE DE FILTRAGE
 # =====================
-df_t = df[df["annee"] == selected_year]
-if month != "Tous":
-    df_t = df_t[df_t["mois"] == month]
-
-df_map = df_t.copy()
-gdf_map = gdf_dept.copy()
+# Tranches mémoïsées dans la session, partagées avec les autres pages
+df_t = tranche(df, selected_year, month, completes=completes)
+df_map = tranche(df, selected_year, month, selected_dep, completes)
+gdf_map = gdf_dept
 
 if selected_dep != "Tous":
-    df_map = df_map[df_map["DEPARTEMENT"] == selected_dep]
     gdf_map = gdf_map[gdf_map["dep"] == selected_dep]
 
 # =====================
@@ -299,88 +343,173 @@ st.markdown("### 📊 Indicateurs Climatiques")
 
 k1, k2, k3, k4 = st.columns(4)
 
-precip_par_station = df_map.groupby("NUM_POSTE")["RR1"].sum().mean()
+# Mêmes indicateurs que l'API (/kpis)
+indic = memoise("kpis", lambda: kpis(df_map), selected_year, month, selected_dep, completes)
 
 with k1:
-    st.metric("🌡️ Température", f"{df_map['T'].mean():.1f} °C", 
-              delta=f"Min: {df_map['T'].min():.1f}°C")
+    st.metric("🌡️ Température", f"{indic['T_moy']:.1f} °C", 
+              delta=f"Min: {indic['T_min']:.1f}°C")
 with k2:
-    st.metric("💧 Humidité", f"{df_map['U'].mean():.1f} %",
-              delta=f"Max: {df_map['U'].max():.0f}%")
+    st.metric("💧 Humidité", f"{indic['U_moy']:.1f} %",
+              delta=f"Max: {indic['U_max']:.0f}%")
 with k3:
-    st.metric("🌧️ Précipitations", f"{precip_par_station:.1f} mm",
+    st.metric("🌧️ Précipitations", f"{indic['RR1_cumul_station']:.1f} mm",
               delta="Cumul moyen/station")
 with k4:
-    st.metric("🌬️ Pression", f"{df_map['PMER'].mean():.1f} hPa",
-              delta=f"Min: {df_map['PMER'].min():.1f} hPa")
+    st.metric("🌬️ Pression", f"{indic['PMER_moy']:.1f} hPa",
+              delta=f"Min: {indic['PMER_min']:.1f} hPa")
 
 st.markdown("<br>", unsafe_allow_html=True)
 
+# =====================
+# MODE VIEWPORT (seules les entités visibles sont envoyées)
+# =====================
+# Vue (emprise, zoom, centre) renvoyée par st_folium au rendu précédent,
+# ignorée si les filtres ont changé depuis
+vue = st.session_state.get("carte_vue")
+if not (mode_viewport and vue and vue["filtres"] == (selected_year, month, selected_dep)):
+    vue = None
+
+if vue:
+    sud, ouest, nord, est = emprise_elargie(vue["bounds"])
+    postes_visibles = index_spatial.stations_dans_emprise(sud, ouest, nord, est)["NUM_POSTE"]
+    zones_visibles = index_spatial.polygones_dans_emprise(sud, ouest, nord, est).index
+    df_vue = df_map[df_map["NUM_POSTE"].isin(postes_visibles)]
+    # Détail des contours adapté au zoom
+    gdf_vue = load_shp_simplifie(tolerance_pour_zoom(vue["zoom"])).loc[gdf_map.index.intersection(zones_visibles)]
+else:
+    df_vue = df_map
+    gdf_vue = gdf_map
+
 # =====================
 # PRÉ-CALCUL SIG
 # =====================
-heat_temp = df_map.groupby(["LAT", "LON"], as_index=False)["T"].mean().dropna()
-heat_rain = df_map.groupby(["LAT", "LON"], as_index=False)["RR1"].sum().mean() # Corrigé pour le cumul
-stations = df_map[["LAT", "LON", "NOM_USUEL"]].drop_duplicates()
+heat_temp = df_vue.groupby(["LAT", "LON"], as_index=False)["T"].mean().dropna()
+heat_rain = df_vue.groupby(["LAT", "LON"], as_index=False)["RR1"].sum().mean() # Corrigé pour le cumul
+stations = df_vue[["LAT", "LON", "NOM_USUEL"]].drop_duplicates()
+
+# Anomalie moyenne de température par station (normales pré-calculées)
+anom_station = anomalies(df_vue, normales, "T").groupby("NUM_POSTE")["anomalie"].mean()
+anom_stations = (
+    df_vue[["NUM_POSTE", "NOM_USUEL", "LAT", "LON"]].drop_duplicates("NUM_POSTE")
+    .join(anom_station, on="NUM_POSTE")
+    .dropna()
+)
+# Anomalie signée : échelle divergente symétrique autour de zéro (gris = normale)
+anom_max = anom_stations["anomalie"].abs().max() if len(anom_stations) else 0
+palette_anom = LinearColormap(
+    ["#3a7bd5", "#00d2ff", "#e8e8e8", "#ffd700", "#ff0000"],
+    vmin=-(anom_max or 1), vmax=anom_max or 1
+)
 
 # =====================
 # CARTE INTERACTIVE
 # =====================
 st.markdown("### 🗺️ Visualisation Cartographique")
 
-# Centrage automatique sur le département sélectionné si filtré
-if selected_dep != "Tous" and not gdf_map.empty:
-    center = [gdf_map.geometry.centroid.y.mean(), gdf_map.geometry.centroid.x.mean()]
-    zoom = 8
+# Centrage automatique sur le département sélectionné si filtré : centroïde
+# (calculé en Lambert-93) et emprise pré-calculés, la carte s'ajuste à l'emprise
+emprise = emprises_departements.get(selected_dep)
+if emprise:
+    center, zoom, bornes = list(emprise["centre"]), 8, emprise["bornes"]
 else:
-    center = [46.6, 1.9]
-    zoom = 6
-
-# Carte avec style sombre moderne
-m = folium.Map(
-    location=center, 
-    zoom_start=zoom, 
-    tiles="CartoDB dark_matter",
-    control_scale=True
-)
-
-# --- Couche GeoJSON avec style néon ---
-folium.GeoJson(
-    gdf_map,
-    name="🗺️ Départements",
-    style_function=lambda x: {
-        "fillColor": "#00d2ff",
-        "fillOpacity": 0.08,
-        "color": "#00d2ff",
-        "weight": 2,
-    },
-    highlight_function=lambda x: {
-        "fillColor": "#00d2ff",
-        "fillOpacity": 0.3,
-        "color": "#ffffff",
-        "weight": 3,
-    },
-    tooltip=folium.GeoJsonTooltip(
-        fields=["nom", "dep"], 
-        aliases=["📍 Nom:", "🔢 Code:"],
-        style="background-color: rgba(0,0,0,0.8); color: white; border-radius: 10px; padding: 10px;"
+    center, zoom, bornes = [46.6, 1.9], 6, None
+center_base, zoom_base = center, zoom
+if vue:
+    center = [vue["center"]["lat"], vue["center"]["lng"]]
+    zoom = vue["zoom"]
+
+# --- Couches statiques (contours, stations) ---
+def couche_departements(gdf, conteneur):
+    # Couche GeoJSON avec style néon
+    folium.GeoJson(
+        gdf,
+        name="🗺️ Départements",
+        style_function=lambda x: {
+            "fillColor": "#00d2ff",
+            "fillOpacity": 0.08,
+            "color": "#00d2ff",
+            "weight": 2,
+        },
+        highlight_function=lambda x: {
+            "fillColor": "#00d2ff",
+            "fillOpacity": 0.3,
+            "color": "#ffffff",
+            "weight": 3,
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields=["nom", "dep"], 
+            aliases=["📍 Nom:", "🔢 Code:"],
+            style="background-color: rgba(0,0,0,0.8); color: white; border-radius: 10px; padding: 10px;"
+        )
+    ).add_to(conteneur)
+
+
+def infobulle_station(nom):
+    # Seuls les marqueurs de stations portent cette infobulle : elle identifie la couche au clic
+    return f"📍 {nom}"
+
+
+def couche_stations(stations, conteneur):
+    # Stations avec style moderne
+    cluster = MarkerCluster(name="📍 Stations météo")
+    for _, row in stations.iterrows():
+        folium.CircleMarker(
+            location=[row["LAT"], row["LON"]],
+            radius=6,
+            popup=f"<b style='color:#00d2ff;'>{row['NOM_USUEL']}</b>",
+            tooltip=infobulle_station(row["NOM_USUEL"]),
+            color="#00d2ff",
+            fill=True,
+            fill_color="#00d2ff",
+            fill_opacity=0.7,
+            weight=2
+        ).add_to(cluster)
+    cluster.add_to(conteneur)
+
+
+@st.cache_resource(max_entries=16)
+def construire_carte_base(selected_dep, center, zoom, bornes, avec_contours, tuiles_vectorielles=False):
+    # Carte avec style sombre moderne, construite une fois par département
+    m = folium.Map(
+        location=list(center), 
+        zoom_start=zoom, 
+        tiles="CartoDB dark_matter",
+        control_scale=True
     )
-).add_to(m)
-
-# --- Stations avec style moderne ---
-cluster = MarkerCluster(name="📍 Stations météo")
-for _, row in stations.iterrows():
-    folium.CircleMarker(
-        location=[row["LAT"], row["LON"]],
-        radius=6,
-        popup=f"<b style='color:#00d2ff;'>{row['NOM_USUEL']}</b>",
-        color="#00d2ff",
-        fill=True,
-        fill_color="#00d2ff",
-        fill_opacity=0.7,
-        weight=2
-    ).add_to(cluster)
-cluster.add_to(m)
+    if bornes:
+        m.fit_bounds(bornes)
+    charger_plugins(m)
+    if tuiles_vectorielles:
+        # Seules les tuiles de la vue et du zoom courants sont chargées
+        VectorGridProtobuf(TILES_URL, "🗺️ Départements", options_vectorgrid(selected_dep)).add_to(m)
+    elif avec_contours:
+        gdf = load_shp()
+        if selected_dep != "Tous":
+            gdf = gdf[gdf["dep"] == selected_dep]
+        couche_departements(gdf, m)
+    return m
+
+
+# Contours : dans la carte en cache, sauf en mode viewport où ils dépendent de la vue
+# (et en tuiles vectorielles, où le client ne demande déjà que les tuiles visibles).
+# Stations : couche dynamique, seules celles ayant des données sur la période filtrée
+# (en tuiles vectorielles, filtre côté client sur le NUM_POSTE des tuiles).
+m = construire_carte_base(selected_dep, tuple(center_base), zoom_base, bornes, avec_contours=vue is None,
+                          tuiles_vectorielles=tuiles_vectorielles)
+couches = []
+if vue and not tuiles_vectorielles:
+    h_dep = folium.FeatureGroup(name="🗺️ Départements", show=True)
+    couche_departements(gdf_vue, h_dep)
+    couches.append(h_dep)
+h0 = folium.FeatureGroup(name="📍 Stations météo", show=True)
+if tuiles_vectorielles:
+    postes_filtres = df_vue["NUM_POSTE"].unique()
+    VectorGridProtobuf(TILES_URL, "📍 Stations météo", options_vectorgrid(selected_dep, postes_filtres),
+                       control=False).add_to(h0)
+else:
+    couche_stations(stations, h0)
+couches.append(h0)
 
 # --- Heatmaps avec gradients personnalisés ---
 h1 = folium.FeatureGroup(name="🔥 Température (Moyenne)", show=True)
@@ -390,25 +519,217 @@ HeatMap(
     blur=18,
     gradient={0.2: "#3a7bd5", 0.4: "#00d2ff", 0.6: "#ffd700", 0.8: "#ff6b35", 1: "#ff0000"}
 ).add_to(h1)
-h1.add_to(m)
 
 h2 = folium.FeatureGroup(name="🌧️ Précipitations (Cumul)", show=False)
-heat_rain_data = df_map.groupby(["LAT", "LON"], as_index=False)["RR1"].sum().dropna()
+heat_rain_data = df_vue.groupby(["LAT", "LON"], as_index=False)["RR1"].sum().dropna()
 HeatMap(
     heat_rain_data.values.tolist(), 
     radius=22, 
     blur=18,
     gradient={0.2: "#e0f7fa", 0.4: "#4dd0e1", 0.6: "#0097a7", 0.8: "#006064", 1: "#1a237e"}
 ).add_to(h2)
-h2.add_to(m)
-
-folium.LayerControl(collapsed=False).add_to(m)
 
-# Affichage de la carte dans un container stylé
+h3 = folium.FeatureGroup(name="🌡️ Anomalie de température", show=False)
+for station_anom in anom_stations.itertuples():
+    folium.CircleMarker(
+        location=[station_anom.LAT, station_anom.LON],
+        radius=8,
+        popup=f"<b>{station_anom.NOM_USUEL}</b><br>Anomalie : {station_anom.anomalie:+.1f} °C",
+        color=palette_anom(station_anom.anomalie),
+        fill=True,
+        fill_color=palette_anom(station_anom.anomalie),
+        fill_opacity=0.8,
+        weight=1
+    ).add_to(h3)
+
+# --- Événements extrêmes (index pré-calculé) ---
+couleurs_evenements = {"canicule": "#ff6b35", "pluie": "#4dd0e1", "tempete": "#f093fb"}
+h4 = folium.FeatureGroup(name="⚠️ Événements extrêmes", show=False)
+evenements_vue = evenements.filtrer(index_evenements, selected_year, month, selected_dep)
+evenements_vue = evenements_vue[evenements_vue["NUM_POSTE"].isin(df_vue["NUM_POSTE"].unique())]
+for ev in evenements_vue.itertuples():
+    folium.CircleMarker(
+        location=[ev.LAT, ev.LON],
+        radius=5 + min(ev.duree, 10),
+        popup=(
+            f"<b style='color:{couleurs_evenements[ev.type]};'>{evenements.CRITERES[ev.type]['label']}</b><br>"
+            f"{ev.NOM_USUEL}<br>{ev.debut:%d/%m/%Y} → {ev.fin:%d/%m/%Y}<br>Pic : {ev.pic:.1f}"
+        ),
+        color=couleurs_evenements[ev.type],
+        fill=True,
+        fill_opacity=0.6,
+        weight=1
+    ).add_to(h4)
+
+# --- Choroplèthe départementale (agrégats pré-calculés, lecture par clé) ---
+# Stations complètes uniquement : agrégats recalculés sur la même tranche que les autres couches
+if variable_choro != "Aucune":
+    choro = CHOROPLETHES[variable_choro]
+    agregats = agregats_departements if not completes else memoise(
+        "agregats_departements", lambda: agregats_par_zone(df_t, zonage, "departement"),
+        selected_year, month, completes
+    )
+    agregats_periode = agregats[
+        (agregats["annee"] == selected_year)
+        & (agregats["mois"] == (TOUS_MOIS if month == "Tous" else month))
+    ].set_index("departement")[variable_choro]
+    gdf_choro = gdf_departements.assign(**{variable_choro: gdf_departements["dep"].map(agregats_periode)})
+    if selected_dep != "Tous":
+        gdf_choro = gdf_choro[gdf_choro["dep"] == selected_dep]
+    h5 = folium.FeatureGroup(name=f"🎨 {choro['label']}", show=True)
+    couche_choroplethe(gdf_choro, variable_choro, choro["couleurs"], h5, alias=f"{choro['label']} ({choro['unite']}):")
+    couches.append(h5)
+
+couches += [h1, h2, h3, h4]
+
+# Affichage de la carte dans un container stylé : seules les couches de données sont renvoyées
 st.markdown('<div class="map-container">', unsafe_allow_html=True)
-st_folium(m, width="100%", height=650)
+# Hors mode viewport, la vue initiale est celle de la carte (ajustée à l'emprise)
+carte = afficher_carte(m, couches, key="carte", center=center if vue else None, zoom=zoom if vue else None,
+                       width="100%", height=650)
 st.markdown('</div>', unsafe_allow_html=True)
 
+carte = carte or {}
+
+# Mémorise la vue pour le prochain rendu en mode viewport
+if carte.get("bounds") and carte["bounds"].get("_southWest", {}).get("lat") is not None:
+    st.session_state["carte_vue"] = {
+        "bounds": carte["bounds"],
+        "zoom": carte.get("zoom") or zoom,
+        "center": carte.get("center") or {"lat": center[0], "lng": center[1]},
+        "filtres": (selected_year, month, selected_dep),
+    }
+
+# Clic sur un marqueur de la couche stations → fiche station (un clic déjà traité
+# n'est pas rejoué au retour sur la page). Anomalies et événements gardent leur popup.
+clic = carte.get("last_object_clicked")
+if clic and clic != st.session_state.get("dernier_clic"):
+    st.session_state["dernier_clic"] = clic
+    station_cliquee = index_spatial.stations_proches(clic["lat"], clic["lng"], k=1).iloc[0]
+    if (carte.get("last_object_clicked_tooltip") == infobulle_station(station_cliquee["NOM_USUEL"])
+            and station_cliquee["distance_km"] < 0.5):
+        st.session_state["station"] = int(station_cliquee["NUM_POSTE"])
+        st.switch_page("pages/4_Station.py")
+
+# =====================
+# EXPLORATION AU CLIC (index spatiaux)
+# =====================
+# Statistiques par station sur la période, calculées une fois puis lues par clé
+stats_stations = memoise(
+    "stats_stations",
+    lambda: df_t.groupby("NUM_POSTE").agg(T=("T", "mean"), RR1=("RR1", "sum"), U=("U", "mean")),
+    selected_year, month, completes
+)
+
+point = carte.get("last_clicked")
+if point:
+    st.markdown("### 📌 Sélection sur la carte")
+    c1, c2 = st.columns(2)
+
+    with c1:
+        zone = index_spatial.polygone_au_point(point["lat"], point["lng"])
+        if zone is not None:
+            dep_zone = int(zone["dep"])
+            # Stations rattachées au département par la table d'affectation (jointure pré-calculée)
+            stats_dep = agreger(
+                stats_stations.reset_index(), zonage, "departement",
+                T=("T", "mean"), RR1=("RR1", "mean"), U=("U", "mean")
+            ).reindex([dep_zone]).iloc[0]
+            n_commune = int((zonage["commune"] == zone["insee"]).sum())
+            st.markdown(f"**📍 {zone['nom']}** — département **{dep_zone}** • {n_commune} station(s) dans la commune")
+            z1, z2, z3 = st.columns(3)
+            z1.metric("🌡️ T° Moy", f"{stats_dep['T']:.1f} °C")
+            z2.metric("🌧️ Cumul/station", f"{stats_dep['RR1']:.1f} mm")
+            z3.metric("💧 Humidité", f"{stats_dep['U']:.1f} %")
+        else:
+            st.info("Aucune zone sous le point cliqué")
+
+    with c2:
+        proches = index_spatial.stations_proches(point["lat"], point["lng"], k=3)
+        proches = proches.join(stats_stations, on="NUM_POSTE")
+        st.markdown("**📡 Stations les plus proches**")
+        st.dataframe(
+            proches[["NOM_USUEL", "distance_km", "T", "RR1", "U"]].round(1).rename(columns={
+                "NOM_USUEL": "Station", "distance_km": "Distance (km)",
+                "T": "T° Moy (°C)", "RR1": "Cumul (mm)", "U": "Humidité (%)"
+            }),
+            hide_index=True
+        )
+
+# Emprise courante de la carte → stations visibles
+bounds = carte.get("bounds")
+if bounds and bounds.get("_southWest", {}).get("lat") is not None:
+    visibles = index_spatial.stations_dans_emprise(
+        bounds["_southWest"]["lat"], bounds["_southWest"]["lng"],
+        bounds["_northEast"]["lat"], bounds["_northEast"]["lng"]
+    )
+    stats_visibles = stats_stations.loc[stats_stations.index.isin(visibles["NUM_POSTE"])]
+    st.caption(
+        f"🔭 {len(stats_visibles)} stations dans la vue • "
+        f"T° moy {stats_visibles['T'].mean():.1f} °C • "
+        f"cumul moyen {stats_visibles['RR1'].mean():.1f} mm"
+    )
+
+# =====================
+# ANIMATION DE L'ANNÉE (frames pré-calculées, lecture côté navigateur)
+# =====================
+st.markdown("### 🎞️ Animation de l'année")
+a1, a2 = st.columns(2)
+with a1:
+    variable_anim = st.radio(
+        "Variable animée",
+        options=list(CHOROPLETHES),
+        format_func=lambda x: CHOROPLETHES[x]["label"],
+        horizontal=True
+    )
+with a2:
+    pas_anim = st.radio("Pas de temps", options=["mois", "jour"], format_func=str.capitalize, horizontal=True)
+
+
+@st.cache_resource(max_entries=8)
+def construire_carte_animee(annee, variable, pas, selected_dep):
+    # Toutes les frames de l'année sont embarquées dans la carte : lecture,
+    # pause et curseur ne provoquent aucun rerun Streamlit
+    etiquettes, postes, positions, valeurs = load_frames(annee, variable, pas)
+    if selected_dep != "Tous":
+        garder = np.isin(postes, index_spatial.stations.loc[index_spatial.stations["DEPARTEMENT"] == selected_dep, "NUM_POSTE"])
+        positions, valeurs = positions[garder], valeurs[:, garder]
+    couleurs = CHOROPLETHES[variable]["couleurs"]
+    m = folium.Map(location=list(center_base), zoom_start=zoom_base, tiles="CartoDB dark_matter")
+    if bornes:
+        m.fit_bounds(bornes)
+    HeatMapWithTime(
+        donnees_heatmap(positions, valeurs),
+        index=etiquettes,
+        name=CHOROPLETHES[variable]["label"],
+        radius=25,
+        max_opacity=0.8,
+        gradient={0.2: couleurs[0], 0.5: couleurs[len(couleurs) // 2], 1: couleurs[-1]},
+        auto_play=False,
+    ).add_to(m)
+    return m
+
+
+st_folium(
+    construire_carte_animee(selected_year, variable_anim, pas_anim, selected_dep),
+    key="carte_animee",
+    width="100%",
+    height=500,
+    returned_objects=[]
+)
+
+# =====================
+# EXPORT (écriture par lots Arrow, au clic)
+# =====================
+with st.expander("💾 Exporter la sélection"):
+    st.markdown("**Observations filtrées**")
+    boutons_export(df_map, f"observations_{selected_year}_{month}_{selected_dep}", "carte_obs", complet=True)
+    st.markdown("**Statistiques par station**")
+    stats_export = index_spatial.stations[["NUM_POSTE", "NOM_USUEL", "DEPARTEMENT", "LAT", "LON"]].join(
+        stats_stations, on="NUM_POSTE", how="inner"
+    )
+    boutons_export(stats_export, f"stations_{selected_year}_{month}", "carte_stations")
+
 # =====================
 # FOOTER
 # =====================
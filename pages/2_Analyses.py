@@ -1,9 +1,16 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+from utils import evenements
+from utils.climatologie import anomalies
+from utils.donnees import load_data, load_normales, load_evenements, load_glissant
+from utils.echantillonnage import reduire
+from utils.export import boutons_export
+from utils.figures import aire, barres, figure, ligne, par_groupe
+from utils.filtres import case_completes, etat_filtres, tranche, widget_filtre
+from utils.glissant import FENETRES, par_departement
+from utils.indicateurs import serie
 
 # =====================
 # CONFIGURATION PAGE
@@ -69,13 +76,11 @@ st.markdown("""
 # =====================
 # CHARGEMENT DONNÉES
 # =====================
-@st.cache_data
-def load_data():
-    df = pd.read_parquet("data/clean/meteo_clean.parquet")
-    df["date"] = pd.to_datetime(df["date"])
-    return df
-
-df = load_data()
+# Manifeste : seules ces colonnes sont lues (les autres, au clic d'export)
+COLONNES = ("NUM_POSTE", "date", "DEPARTEMENT", "NOM_USUEL", "T", "RR1", "U", "FF", "DD", "annee", "mois")
+df = load_data(COLONNES)
+normales = load_normales()
+index_evenements = load_evenements()
 
 # Dictionnaire mois
 noms_mois = {
@@ -113,43 +118,43 @@ with st.sidebar:
     st.page_link("pages/1_Carte.py", label="🗺️ Carte")
     st.page_link("pages/2_Analyses.py", label="📈 Analyses")
     st.page_link("pages/3_Comparaison.py", label="🔄 Comparaison")
+    st.page_link("pages/4_Station.py", label="📍 Station")
     
     st.markdown("---")
     
     st.markdown("### 📅 Période d'analyse")
     
     # Sélection de l'année
+    # Filtres partagés avec les autres pages (session_state)
+    filtres = etat_filtres(df)
     annees = sorted(df["annee"].unique().astype(int))
-    selected_year = st.select_slider(
-        "Année",
-        options=annees,
-        value=int(df["annee"].max())
+    selected_year = widget_filtre(
+        st.select_slider, filtres, "annee", "Année",
+        options=annees
     )
     
     # Sélection du mois (optionnel)
-    month = st.selectbox(
-        "Mois (optionnel)",
-        options=["Tous"] + list(range(1, 13)),
-        index=0,
+    options_mois = ["Tous"] + list(range(1, 13))
+    month = widget_filtre(
+        st.selectbox, filtres, "mois", "Mois (optionnel)",
+        options=options_mois,
         format_func=lambda x: "📆 Tous les mois" if x == "Tous" else noms_mois_emoji.get(x, str(x))
     )
     
     st.markdown("---")
     st.markdown("### 🗺️ Zone géographique")
-    selected_dep = st.selectbox(
-        "Département",
-        ["Tous"] + sorted(df["DEPARTEMENT"].dropna().unique()),
+    options_dep = ["Tous"] + sorted(df["DEPARTEMENT"].dropna().unique())
+    selected_dep = widget_filtre(
+        st.selectbox, filtres, "departement", "Département",
+        options=options_dep,
         format_func=lambda x: "🌍 Tous" if x == "Tous" else f"📍 {x}"
     )
+    completes = case_completes(filtres)
 
 # =====================
-# FILTRAGE
+# FILTRAGE (tranche mémoïsée, partagée avec la page Carte)
 # =====================
-df_filtered = df[df["annee"] == selected_year]
-if month != "Tous":
-    df_filtered = df_filtered[df_filtered["mois"] == month]
-if selected_dep != "Tous":
-    df_filtered = df_filtered[df_filtered["DEPARTEMENT"] == selected_dep]
+df_filtered = tranche(df, selected_year, month, selected_dep, completes)
 
 # =====================
 # TITRE
@@ -195,34 +200,16 @@ col_a1, col_a2 = st.columns(2)
 with col_a1:
     temp_annual = df_annual.groupby("annee")["T"].mean().reset_index()
     
-    fig_temp_annual = px.line(
-        temp_annual, 
-        x="annee", 
-        y="T",
-        markers=True,
-        title="🌡️ Température moyenne par année"
-    )
-    fig_temp_annual.update_traces(
-        line=dict(color="#ff6b6b", width=4),
-        marker=dict(size=12, color="#ff6b6b", symbol="circle")
-    )
-    fig_temp_annual.add_trace(go.Scatter(
-        x=temp_annual["annee"],
-        y=temp_annual["T"],
-        fill='tozeroy',
-        fillcolor='rgba(255, 107, 107, 0.2)',
-        line=dict(color='rgba(0,0,0,0)'),
+    fig_temp_annual = figure(
+        [
+            ligne(temp_annual["annee"], temp_annual["T"], couleur="#ff6b6b", marqueurs=True, largeur=4, taille=12),
+            aire(temp_annual["annee"], temp_annual["T"], 'rgba(255, 107, 107, 0.2)'),
+        ],
+        titre="🌡️ Température moyenne par année",
+        x="Année",
+        y="Température (°C)",
+        xaxis=dict(dtick=1),
         showlegend=False
-    ))
-    fig_temp_annual.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis_title="Année",
-        yaxis_title="Température (°C)",
-        font=dict(family="Poppins", color="#e8e8e8"),
-        xaxis=dict(gridcolor='rgba(255,255,255,0.1)', dtick=1),
-        yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
     )
     st.plotly_chart(fig_temp_annual)
 
@@ -231,22 +218,12 @@ with col_a2:
     precip_annual = df_annual.groupby(["annee", "NUM_POSTE"])["RR1"].sum().reset_index()
     precip_annual = precip_annual.groupby("annee")["RR1"].mean().reset_index()
     
-    fig_precip_annual = px.bar(
-        precip_annual,
-        x="annee",
-        y="RR1",
-        title="🌧️ Précipitations moyennes par année"
-    )
-    fig_precip_annual.update_traces(marker_color='#4ecdc4')
-    fig_precip_annual.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis_title="Année",
-        yaxis_title="Précipitations (mm)",
-        font=dict(family="Poppins", color="#e8e8e8"),
-        xaxis=dict(gridcolor='rgba(255,255,255,0.1)', dtick=1),
-        yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
+    fig_precip_annual = figure(
+        [barres(precip_annual["annee"], precip_annual["RR1"], couleur='#4ecdc4')],
+        titre="🌧️ Précipitations moyennes par année",
+        x="Année",
+        y="Précipitations (mm)",
+        xaxis=dict(dtick=1)
     )
     st.plotly_chart(fig_precip_annual)
 
@@ -264,53 +241,20 @@ with col1:
         temp_monthly = df_filtered.groupby("mois")["T"].mean().reset_index()
         temp_monthly["mois_nom"] = temp_monthly["mois"].map(noms_mois)
         
-        fig_temp = px.line(
-            temp_monthly, 
-            x="mois_nom", 
-            y="T",
-            markers=True,
-            title=f"🌡️ Température moyenne mensuelle ({selected_year})"
-        )
-        fig_temp.update_traces(
-            line=dict(color="#ff6b6b", width=3),
-            marker=dict(size=10, color="#ff6b6b")
-        )
-        # Ajouter aire sous la courbe
-        fig_temp.add_trace(go.Scatter(
-            x=temp_monthly["mois_nom"],
-            y=temp_monthly["T"],
-            fill='tozeroy',
-            fillcolor='rgba(255, 107, 107, 0.2)',
-            line=dict(color='rgba(0,0,0,0)'),
-            showlegend=False
-        ))
+        traces_temp = [
+            ligne(temp_monthly["mois_nom"], temp_monthly["T"], couleur="#ff6b6b", marqueurs=True),
+            # Ajouter aire sous la courbe
+            aire(temp_monthly["mois_nom"], temp_monthly["T"], 'rgba(255, 107, 107, 0.2)'),
+        ]
+        titre_temp = f"🌡️ Température moyenne mensuelle ({selected_year})"
     else:
         # Moyenne journalière pour le mois sélectionné
-        df_filtered["jour"] = df_filtered["date"].dt.day
-        temp_daily = df_filtered.groupby("jour")["T"].mean().reset_index()
+        temp_daily = df_filtered.groupby(df_filtered["date"].dt.day.rename("jour"))["T"].mean().reset_index()
         
-        fig_temp = px.line(
-            temp_daily, 
-            x="jour", 
-            y="T",
-            markers=True,
-            title=f"🌡️ Température moyenne journalière ({noms_mois[month]} {selected_year})"
-        )
-        fig_temp.update_traces(
-            line=dict(color="#ff6b6b", width=3),
-            marker=dict(size=8, color="#ff6b6b")
-        )
+        traces_temp = [ligne(temp_daily["jour"], temp_daily["T"], couleur="#ff6b6b", marqueurs=True, taille=8)]
+        titre_temp = f"🌡️ Température moyenne journalière ({noms_mois[month]} {selected_year})"
     
-    fig_temp.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis_title="",
-        yaxis_title="Température (°C)",
-        font=dict(family="Poppins", color="#e8e8e8"),
-        xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-        yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
-    )
+    fig_temp = figure(traces_temp, titre=titre_temp, y="Température (°C)", showlegend=False)
     st.plotly_chart(fig_temp)
 
 # --- Précipitations cumulées ---
@@ -321,38 +265,119 @@ with col2:
         precip_monthly = precip_monthly.groupby("mois")["RR1"].mean().reset_index()
         precip_monthly["mois_nom"] = precip_monthly["mois"].map(noms_mois)
         
-        fig_precip = px.bar(
-            precip_monthly,
-            x="mois_nom",
-            y="RR1",
-            title=f"🌧️ Précipitations moyennes mensuelles ({selected_year})"
+        fig_precip = figure(
+            [barres(precip_monthly["mois_nom"], precip_monthly["RR1"], couleur='#4ecdc4')],
+            titre=f"🌧️ Précipitations moyennes mensuelles ({selected_year})",
+            y="Précipitations (mm)"
         )
-        fig_precip.update_traces(marker_color='#4ecdc4')
     else:
-        df_filtered["jour"] = df_filtered["date"].dt.day
-        precip_daily = df_filtered.groupby(["jour", "NUM_POSTE"])["RR1"].sum().reset_index()
+        precip_daily = df_filtered.groupby([df_filtered["date"].dt.day.rename("jour"), "NUM_POSTE"])["RR1"].sum().reset_index()
         precip_daily = precip_daily.groupby("jour")["RR1"].mean().reset_index()
         
-        fig_precip = px.bar(
-            precip_daily,
-            x="jour",
-            y="RR1",
-            title=f"🌧️ Précipitations journalières ({noms_mois[month]} {selected_year})"
+        fig_precip = figure(
+            [barres(precip_daily["jour"], precip_daily["RR1"], couleur='#4ecdc4')],
+            titre=f"🌧️ Précipitations journalières ({noms_mois[month]} {selected_year})",
+            y="Précipitations (mm)"
         )
-        fig_precip.update_traces(marker_color='#4ecdc4')
     
-    fig_precip.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis_title="",
-        yaxis_title="Précipitations (mm)",
-        font=dict(family="Poppins", color="#e8e8e8"),
-        xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-        yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
-    )
     st.plotly_chart(fig_precip)
 
+# =====================
+# ANOMALIES CLIMATIQUES (écart aux normales journalières)
+# =====================
+st.markdown("### 🌡️ Anomalies Climatiques")
+
+anom_temp = anomalies(df_filtered, normales, "T")
+anom_temp = anom_temp.groupby("date")[["valeur", "normale", "q10", "q90", "anomalie"]].mean().reset_index()
+anom_rain = anomalies(df_filtered, normales, "RR1")
+anom_rain = anom_rain.groupby("date")[["valeur", "normale"]].mean().reset_index()
+
+col_an1, col_an2 = st.columns(2)
+
+# --- Anomalie de température journalière ---
+with col_an1:
+    fig_anom = figure(
+        [barres(
+            anom_temp["date"],
+            anom_temp["anomalie"],
+            couleur=np.where(anom_temp["anomalie"] >= 0, "#ff6b6b", "#3a7bd5"),
+            nom="Anomalie"
+        )],
+        titre="🌡️ Écart de température à la normale",
+        y="Anomalie (°C)",
+        showlegend=False
+    )
+    st.plotly_chart(fig_anom)
+
+# --- Cumul de précipitations observé vs normal ---
+with col_an2:
+    normale_cumulee = ligne(anom_rain["date"], anom_rain["normale"].cumsum(), couleur="#a0a0a0", nom="Normale", largeur=2)
+    normale_cumulee["line"]["dash"] = "dash"
+    fig_anom_rain = figure(
+        [
+            normale_cumulee,
+            ligne(anom_rain["date"], anom_rain["valeur"].cumsum(), couleur="#4ecdc4", nom="Observé"),
+        ],
+        titre="🌧️ Cumul de précipitations vs normale",
+        y="Précipitations (mm)"
+    )
+    st.plotly_chart(fig_anom_rain)
+
+# =====================
+# STATISTIQUES GLISSANTES (toutes les années)
+# =====================
+st.markdown("### 📉 Moyennes & Cumuls Glissants")
+
+variables_glissantes = {
+    "T_moy": ("🌡️ Température moyenne", "Température (°C)"),
+    "RR1_cumul": ("🌧️ Cumul de précipitations", "Précipitations (mm)"),
+    "RR1_moy": ("🌧️ Précipitations moyennes journalières", "Précipitations (mm/j)"),
+    "U_moy": ("💧 Humidité moyenne", "Humidité (%)"),
+}
+
+cg1, cg2, cg3 = st.columns(3)
+with cg1:
+    fenetre = st.radio("Fenêtre", FENETRES, horizontal=True, format_func=lambda x: f"{x} jours")
+with cg2:
+    var_glissante = st.selectbox("Variable", list(variables_glissantes), format_func=lambda x: variables_glissantes[x][0])
+with cg3:
+    niveau = st.radio("Niveau", ["Département", "Station"], horizontal=True)
+
+df_glissant = load_glissant(fenetre)
+if selected_dep != "Tous":
+    df_glissant = df_glissant[df_glissant["DEPARTEMENT"] == selected_dep]
+
+if niveau == "Département":
+    serie_glissante = par_departement(df_glissant)
+    couleur_glissante = "DEPARTEMENT"
+else:
+    stations_dispo = df_filtered.drop_duplicates("NUM_POSTE").set_index("NUM_POSTE")["NOM_USUEL"].sort_values()
+    postes_choisis = st.multiselect(
+        "Stations",
+        options=list(stations_dispo.index),
+        default=list(stations_dispo.index[:3]),
+        format_func=lambda x: f"📍 {stations_dispo[x]}"
+    )
+    serie_glissante = df_glissant[df_glissant["NUM_POSTE"].isin(postes_choisis)].copy()
+    serie_glissante["Station"] = serie_glissante["NUM_POSTE"].map(stations_dispo)
+    couleur_glissante = "Station"
+
+# Zoom : la plage choisie est ré-échantillonnée, donc plus détaillée
+date_min, date_max = df_glissant["date"].min().date(), df_glissant["date"].max().date()
+zoom_glissant = st.slider("🔍 Période affichée", min_value=date_min, max_value=date_max, value=(date_min, date_max), format="DD/MM/YYYY")
+serie_glissante = serie_glissante[serie_glissante["date"].between(pd.Timestamp(zoom_glissant[0]), pd.Timestamp(zoom_glissant[1]))]
+
+fig_glissant = figure(
+    par_groupe(
+        reduire(serie_glissante, "date", var_glissante, groupe=couleur_glissante),
+        couleur_glissante, ligne, "date", var_glissante, largeur=2
+    ),
+    titre=f"{variables_glissantes[var_glissante][0]} sur {fenetre} jours glissants",
+    y=variables_glissantes[var_glissante][1],
+    legend=dict(title={"text": niveau})
+)
+st.plotly_chart(fig_glissant)
+
 # =====================
 # GRAPHIQUES - LIGNE 2 : Humidité & Rose des vents
 # =====================
@@ -361,43 +386,26 @@ st.markdown("### 💧 Humidité & 🧭 Rose des Vents")
 col3, col4 = st.columns(2)
 
 # --- Humidité (Bar Chart) ---
+echelle_humidite = [[0, "#ffecd2"], [0.25, "#fcb69f"], [0.5, "#ff9a9e"], [0.75, "#a18cd1"], [1, "#5fc3e4"]]
 with col3:
     if month == "Tous":
         humid_monthly = df_filtered.groupby("mois")["U"].mean().reset_index()
         humid_monthly["mois_nom"] = humid_monthly["mois"].map(noms_mois)
         
-        fig_humid = px.bar(
-            humid_monthly,
-            x="mois_nom",
-            y="U",
-            title=f"💧 Humidité moyenne mensuelle ({selected_year})",
-            color="U",
-            color_continuous_scale=["#ffecd2", "#fcb69f", "#ff9a9e", "#a18cd1", "#5fc3e4"]
+        fig_humid = figure(
+            [barres(humid_monthly["mois_nom"], humid_monthly["U"], echelle=echelle_humidite)],
+            titre=f"💧 Humidité moyenne mensuelle ({selected_year})",
+            y="Humidité (%)"
         )
     else:
-        df_filtered["jour"] = df_filtered["date"].dt.day
-        humid_daily = df_filtered.groupby("jour")["U"].mean().reset_index()
+        humid_daily = df_filtered.groupby(df_filtered["date"].dt.day.rename("jour"))["U"].mean().reset_index()
         
-        fig_humid = px.bar(
-            humid_daily,
-            x="jour",
-            y="U",
-            title=f"💧 Humidité moyenne journalière ({noms_mois[month]} {selected_year})",
-            color="U",
-            color_continuous_scale=["#ffecd2", "#fcb69f", "#ff9a9e", "#a18cd1", "#5fc3e4"]
+        fig_humid = figure(
+            [barres(humid_daily["jour"], humid_daily["U"], echelle=echelle_humidite)],
+            titre=f"💧 Humidité moyenne journalière ({noms_mois[month]} {selected_year})",
+            y="Humidité (%)"
         )
     
-    fig_humid.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis_title="",
-        yaxis_title="Humidité (%)",
-        font=dict(family="Poppins", color="#e8e8e8"),
-        xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-        yaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-        coloraxis_showscale=False
-    )
     st.plotly_chart(fig_humid)
 
 # --- Rose des Vents ---
@@ -437,41 +445,52 @@ with col4:
         wind_counts = wind_counts.sort_values("direction_cat")
         
         # Créer la rose des vents
-        fig_wind = px.bar_polar(
-            wind_counts,
-            r="count",
-            theta="direction_cat",
-            color="vitesse_cat",
-            title="🧭 Rose des Vents",
-            color_discrete_sequence=["#00d2ff", "#3a7bd5", "#667eea", "#764ba2", "#f093fb"]
-        )
-        
-        fig_wind.update_layout(
-            template="plotly_dark",
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(family="Poppins", color="#e8e8e8"),
-            polar=dict(
-                bgcolor='rgba(0,0,0,0)',
-                radialaxis=dict(
-                    gridcolor='rgba(255,255,255,0.1)',
-                    linecolor='rgba(255,255,255,0.1)'
-                ),
-                angularaxis=dict(
-                    gridcolor='rgba(255,255,255,0.1)',
-                    linecolor='rgba(255,255,255,0.1)'
-                )
-            ),
-            legend=dict(
-                title="Vitesse",
-                bgcolor='rgba(0,0,0,0.3)',
-                bordercolor='rgba(255,255,255,0.1)'
-            )
+        couleurs_vent = ["#00d2ff", "#3a7bd5", "#667eea", "#764ba2", "#f093fb"]
+        fig_wind = figure(
+            [
+                {"type": "barpolar", "r": d["count"].to_numpy(), "theta": d["direction_cat"].astype(str).to_numpy(),
+                 "name": str(vitesse), "marker": {"color": couleur}}
+                for (vitesse, d), couleur in zip(wind_counts.groupby("vitesse_cat", observed=False), couleurs_vent)
+            ],
+            type_="polaire",
+            titre="🧭 Rose des Vents",
+            legend=dict(title={"text": "Vitesse"})
         )
         st.plotly_chart(fig_wind)
     else:
         st.warning("⚠️ Pas de données de vent disponibles pour cette période")
 
+# =====================
+# ÉVÉNEMENTS EXTRÊMES (index pré-calculé)
+# =====================
+st.markdown("### ⚠️ Événements Extrêmes")
+
+df_events = evenements.filtrer(index_evenements, selected_year, month, selected_dep)
+
+if len(df_events) > 0:
+    ev1, ev2, ev3 = st.columns(3)
+    for col_ev, (type_ev, critere) in zip([ev1, ev2, ev3], evenements.CRITERES.items()):
+        with col_ev:
+            st.metric(critere["label"], f"{(df_events['type'] == type_ev).sum()}", delta="épisodes")
+
+    # Intensité dans l'unité de chaque type (°C·j, mm, m/s) : tri à l'intérieur de chaque type
+    ordre_types = {k: i for i, k in enumerate(evenements.CRITERES)}
+    st.dataframe(
+        df_events.sort_values(
+            ["type", "intensite"], ascending=[True, False],
+            key=lambda s: s.map(ordre_types) if s.name == "type" else s
+        )
+        .assign(type=lambda d: d["type"].map({k: c["label"] for k, c in evenements.CRITERES.items()}))
+        [["type", "NOM_USUEL", "DEPARTEMENT", "debut", "fin", "duree", "pic", "intensite"]]
+        .rename(columns={
+            "type": "Type", "NOM_USUEL": "Station", "DEPARTEMENT": "Département",
+            "debut": "Début", "fin": "Fin", "duree": "Durée (j)", "pic": "Pic", "intensite": "Intensité"
+        }),
+        hide_index=True
+    )
+else:
+    st.info("✅ Aucun événement extrême détecté sur cette période")
+
 # =====================
 # STATISTIQUES RÉCAPITULATIVES
 # =====================
@@ -508,6 +527,15 @@ with stat4:
         delta=f"Moy: {df_filtered['FF'].mean():.1f} m/s"
     )
 
+# =====================
+# EXPORT (écriture par lots Arrow, au clic)
+# =====================
+with st.expander("💾 Exporter la sélection"):
+    st.markdown("**Observations filtrées**")
+    boutons_export(df_filtered, f"observations_{selected_year}_{month}_{selected_dep}", "analyses_obs", complet=True)
+    st.markdown("**Série mensuelle**")
+    boutons_export(serie(df_filtered, ["mois"]), f"serie_mensuelle_{selected_year}_{selected_dep}", "analyses_mois")
+
 # =====================
 # FOOTER
 # =====================
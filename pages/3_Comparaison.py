@@ -1,9 +1,12 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+from utils.distributions import resume_boites, traces_boites
+from utils.donnees import load_data
+from utils.export import boutons_export
+from utils.figures import GRILLE, PALETTE, barres, figure, ligne, par_groupe
+from utils.filtres import case_completes, etat_filtres, memoise, tranche, widget_filtre
+from utils.indicateurs import comparaison
 
 # =====================
 # CONFIGURATION PAGE
@@ -70,13 +73,9 @@ st.markdown("""
 # =====================
 # CHARGEMENT DONNÉES
 # =====================
-@st.cache_data
-def load_data():
-    df = pd.read_parquet("data/clean/meteo_clean.parquet")
-    df["date"] = pd.to_datetime(df["date"])
-    return df
-
-df = load_data()
+# Manifeste : seules ces colonnes sont lues (les autres, au clic d'export)
+COLONNES = ("NUM_POSTE", "DEPARTEMENT", "T", "RR1", "U", "FF", "PMER", "annee", "mois")
+df = load_data(COLONNES)
 
 # Dictionnaire mois
 noms_mois = {
@@ -117,9 +116,13 @@ with st.sidebar:
     st.page_link("pages/1_Carte.py", label="🗺️ Carte")
     st.page_link("pages/2_Analyses.py", label="📈 Analyses")
     st.page_link("pages/3_Comparaison.py", label="🔄 Comparaison")
+    st.page_link("pages/4_Station.py", label="📍 Station")
     
     st.markdown("---")
     
+    # Filtres partagés avec les autres pages (session_state)
+    filtres = etat_filtres(df)
+
     st.markdown("### 📍 Sélection des départements")
     
     # Sélection multiple de départements
@@ -136,19 +139,19 @@ with st.sidebar:
     
     # Sélection de l'année
     annees = sorted(df["annee"].unique().astype(int))
-    selected_year = st.select_slider(
-        "Année",
-        options=annees,
-        value=int(df["annee"].max())
+    selected_year = widget_filtre(
+        st.select_slider, filtres, "annee", "Année",
+        options=annees
     )
     
     # Sélection du mois (optionnel)
-    month = st.selectbox(
-        "Mois (optionnel)",
-        options=["Tous"] + list(range(1, 13)),
-        index=0,
+    options_mois = ["Tous"] + list(range(1, 13))
+    month = widget_filtre(
+        st.selectbox, filtres, "mois", "Mois (optionnel)",
+        options=options_mois,
         format_func=lambda x: "📆 Tous les mois" if x == "Tous" else noms_mois_emoji.get(x, str(x))
     )
+    completes = case_completes(filtres)
     
     st.markdown("---")
     st.markdown("""
@@ -168,9 +171,8 @@ with st.sidebar:
 # =====================
 # FILTRAGE
 # =====================
-df_filtered = df[df["annee"] == selected_year].copy()
-if month != "Tous":
-    df_filtered = df_filtered[df_filtered["mois"] == month]
+# Copie : la tranche mémoïsée est partagée avec les autres pages
+df_filtered = tranche(df, selected_year, month, completes=completes).copy()
 
 # Convertir DEPARTEMENT en string pour éviter le tri numérique
 df_filtered["DEPARTEMENT"] = df_filtered["DEPARTEMENT"].astype(str)
@@ -218,23 +220,28 @@ if len(selected_deps) < 2:
 st.markdown("### 📋 Tableau Comparatif")
 
 # Calculer les statistiques par département
-stats = []
-for dep in selected_deps_str:
-    dep_data = df_compare[df_compare["DEPARTEMENT"] == dep]
-    precip_total = dep_data.groupby("NUM_POSTE")["RR1"].sum().mean()
-    stats.append({
-        "Département": dep,
-        "🌡️ T° Moy (°C)": round(dep_data["T"].mean(), 1),
-        "🌡️ T° Max (°C)": round(dep_data["T"].max(), 1),
-        "🌡️ T° Min (°C)": round(dep_data["T"].min(), 1),
-        "🌧️ Précip (mm)": round(precip_total, 1),
-        "💧 Humid (%)": round(dep_data["U"].mean(), 1),
-        "💨 Vent (m/s)": round(dep_data["FF"].mean(), 1),
-    })
-
-df_stats = pd.DataFrame(stats)
+# (mêmes formules que l'API : utils/indicateurs.py)
+df_stats = comparaison(df_compare).set_index("DEPARTEMENT").reindex(selected_deps_str).reset_index()
+df_stats = df_stats.rename(columns={
+    "DEPARTEMENT": "Département",
+    "T_moy": "🌡️ T° Moy (°C)",
+    "T_max": "🌡️ T° Max (°C)",
+    "T_min": "🌡️ T° Min (°C)",
+    "RR1_cumul_station": "🌧️ Précip (mm)",
+    "U_moy": "💧 Humid (%)",
+    "FF_moy": "💨 Vent (m/s)",
+})[["Département", "🌡️ T° Moy (°C)", "🌡️ T° Max (°C)", "🌡️ T° Min (°C)", "🌧️ Précip (mm)", "💧 Humid (%)", "💨 Vent (m/s)"]].round(1)
 st.dataframe(df_stats, hide_index=True)
 
+# Boîtes à moustaches (vue mensuelle) : quartiles et moustaches précalculés
+# par département, mémoïsés avec la sélection
+if month != "Tous":
+    resumes = {
+        col: memoise("boites", lambda col=col: resume_boites(df_compare, "DEPARTEMENT", col),
+                     selected_year, month, tuple(selected_deps_str), completes, col)
+        for col in ("T", "RR1")
+    }
+
 # =====================
 # GRAPHIQUES COMPARATIFS
 # =====================
@@ -247,24 +254,16 @@ with col1:
     temp_by_dep = df_compare.groupby("DEPARTEMENT")["T"].mean().reset_index()
     temp_by_dep = temp_by_dep.sort_values("T", ascending=False)
     
-    fig_temp_bar = px.bar(
-        temp_by_dep,
-        x="DEPARTEMENT",
-        y="T",
-        color="T",
-        color_continuous_scale=["#3a7bd5", "#00d2ff", "#ffd700", "#ff6b6b"],
-        title="🌡️ Température moyenne par département"
-    )
-    fig_temp_bar.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis_title="Département",
-        yaxis_title="Température (°C)",
-        font=dict(family="Poppins", color="#e8e8e8"),
-        xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-        yaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-        coloraxis_showscale=False
+    fig_temp_bar = figure(
+        [barres(
+            temp_by_dep["DEPARTEMENT"],
+            temp_by_dep["T"],
+            echelle=[[0, "#3a7bd5"], [1/3, "#00d2ff"], [2/3, "#ffd700"], [1, "#ff6b6b"]]
+        )],
+        titre="🌡️ Température moyenne par département",
+        x="Département",
+        y="Température (°C)",
+        xaxis=dict(type="category")
     )
     st.plotly_chart(fig_temp_bar)
 
@@ -274,43 +273,23 @@ with col2:
         temp_monthly = df_compare.groupby(["mois", "DEPARTEMENT"])["T"].mean().reset_index()
         temp_monthly["mois_nom"] = temp_monthly["mois"].map(noms_mois)
         
-        fig_temp_line = px.line(
-            temp_monthly,
-            x="mois_nom",
-            y="T",
-            color="DEPARTEMENT",
-            markers=True,
-            title="🌡️ Évolution mensuelle comparée"
-        )
-        fig_temp_line.update_layout(
-            template="plotly_dark",
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis_title="",
-            yaxis_title="Température (°C)",
-            font=dict(family="Poppins", color="#e8e8e8"),
-            xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-            yaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-            legend=dict(title="Département", bgcolor='rgba(0,0,0,0.3)')
+        fig_temp_line = figure(
+            par_groupe(temp_monthly, "DEPARTEMENT", ligne, "mois_nom", "T", marqueurs=True, largeur=2, taille=6),
+            titre="🌡️ Évolution mensuelle comparée",
+            y="Température (°C)",
+            legend=dict(title={"text": "Département"})
         )
         st.plotly_chart(fig_temp_line)
     else:
         # Box plot pour un mois spécifique
-        fig_temp_box = px.box(
-            df_compare,
-            x="DEPARTEMENT",
-            y="T",
-            color="DEPARTEMENT",
-            title=f"🌡️ Distribution des températures ({noms_mois[month]})"
-        )
-        fig_temp_box.update_layout(
-            template="plotly_dark",
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis_title="Département",
-            yaxis_title="Température (°C)",
-            font=dict(family="Poppins", color="#e8e8e8"),
-            showlegend=False
+        fig_temp_box = figure(
+            traces_boites(*resumes["T"], "DEPARTEMENT", "T", PALETTE),
+            type_="boite",
+            titre=f"🌡️ Distribution des températures ({noms_mois[month]})",
+            x="Département",
+            y="Température (°C)",
+            showlegend=False,
+            xaxis=dict(type="category")
         )
         st.plotly_chart(fig_temp_box)
 
@@ -327,24 +306,16 @@ with col3:
     precip_by_dep = precip_by_dep.groupby("DEPARTEMENT")["RR1"].mean().reset_index()
     precip_by_dep = precip_by_dep.sort_values("RR1", ascending=False)
     
-    fig_precip_bar = px.bar(
-        precip_by_dep,
-        x="DEPARTEMENT",
-        y="RR1",
-        color="RR1",
-        color_continuous_scale=["#e0f7fa", "#4dd0e1", "#0097a7", "#006064"],
-        title="🌧️ Précipitations cumulées par département"
-    )
-    fig_precip_bar.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis_title="Département",
-        yaxis_title="Précipitations (mm)",
-        font=dict(family="Poppins", color="#e8e8e8"),
-        xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-        yaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-        coloraxis_showscale=False
+    fig_precip_bar = figure(
+        [barres(
+            precip_by_dep["DEPARTEMENT"],
+            precip_by_dep["RR1"],
+            echelle=[[0, "#e0f7fa"], [1/3, "#4dd0e1"], [2/3, "#0097a7"], [1, "#006064"]]
+        )],
+        titre="🌧️ Précipitations cumulées par département",
+        x="Département",
+        y="Précipitations (mm)",
+        xaxis=dict(type="category")
     )
     st.plotly_chart(fig_precip_bar)
 
@@ -355,43 +326,24 @@ with col4:
         precip_monthly = precip_monthly.groupby(["mois", "DEPARTEMENT"])["RR1"].mean().reset_index()
         precip_monthly["mois_nom"] = precip_monthly["mois"].map(noms_mois)
         
-        fig_precip_line = px.bar(
-            precip_monthly,
-            x="mois_nom",
-            y="RR1",
-            color="DEPARTEMENT",
+        fig_precip_line = figure(
+            par_groupe(precip_monthly, "DEPARTEMENT", barres, "mois_nom", "RR1"),
+            titre="🌧️ Précipitations mensuelles comparées",
+            y="Précipitations (mm)",
             barmode="group",
-            title="🌧️ Précipitations mensuelles comparées"
-        )
-        fig_precip_line.update_layout(
-            template="plotly_dark",
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis_title="",
-            yaxis_title="Précipitations (mm)",
-            font=dict(family="Poppins", color="#e8e8e8"),
-            xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-            yaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-            legend=dict(title="Département", bgcolor='rgba(0,0,0,0.3)')
+            legend=dict(title={"text": "Département"})
         )
         st.plotly_chart(fig_precip_line)
     else:
         # Box plot précipitations
-        fig_precip_box = px.box(
-            df_compare,
-            x="DEPARTEMENT",
-            y="RR1",
-            color="DEPARTEMENT",
-            title=f"🌧️ Distribution des précipitations ({noms_mois[month]})"
-        )
-        fig_precip_box.update_layout(
-            template="plotly_dark",
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis_title="Département",
-            yaxis_title="Précipitations (mm)",
-            font=dict(family="Poppins", color="#e8e8e8"),
-            showlegend=False
+        fig_precip_box = figure(
+            traces_boites(*resumes["RR1"], "DEPARTEMENT", "RR1", PALETTE),
+            type_="boite",
+            titre=f"🌧️ Distribution des précipitations ({noms_mois[month]})",
+            x="Département",
+            y="Précipitations (mm)",
+            showlegend=False,
+            xaxis=dict(type="category")
         )
         st.plotly_chart(fig_precip_box)
 
@@ -430,8 +382,6 @@ for col in ["Température", "Précipitations", "Humidité", "Vent", "Pression"]:
 
 # Créer le radar chart
 categories = ["Température", "Précipitations", "Humidité", "Vent", "Pression"]
-fig_radar = go.Figure()
-
 # Couleurs prédéfinies pour le radar
 radar_colors = [
     ("#00d2ff", "rgba(0, 210, 255, 0.2)"),
@@ -442,6 +392,7 @@ radar_colors = [
     ("#e74c3c", "rgba(231, 76, 60, 0.2)"),
 ]
 
+traces_radar = []
 for i, dep in enumerate(selected_deps_str):
     dep_row = df_radar[df_radar["Département"] == dep].iloc[0]
     values = [dep_row[f"{cat}_norm"] for cat in categories]
@@ -450,7 +401,8 @@ for i, dep in enumerate(selected_deps_str):
     color_idx = i % len(radar_colors)
     line_color, fill_color = radar_colors[color_idx]
     
-    fig_radar.add_trace(go.Scatterpolar(
+    traces_radar.append(dict(
+        type="scatterpolar",
         r=values,
         theta=categories + [categories[0]],
         fill='toself',
@@ -459,30 +411,12 @@ for i, dep in enumerate(selected_deps_str):
         fillcolor=fill_color
     ))
 
-fig_radar.update_layout(
-    template="plotly_dark",
-    paper_bgcolor='rgba(0,0,0,0)',
-    plot_bgcolor='rgba(0,0,0,0)',
-    font=dict(family="Poppins", color="#e8e8e8"),
-    polar=dict(
-        bgcolor='rgba(0,0,0,0)',
-        radialaxis=dict(
-            visible=True,
-            range=[0, 1],
-            gridcolor='rgba(255,255,255,0.1)',
-            linecolor='rgba(255,255,255,0.1)'
-        ),
-        angularaxis=dict(
-            gridcolor='rgba(255,255,255,0.1)',
-            linecolor='rgba(255,255,255,0.1)'
-        )
-    ),
-    legend=dict(
-        title="Département",
-        bgcolor='rgba(0,0,0,0.3)',
-        bordercolor='rgba(255,255,255,0.1)'
-    ),
-    title="🎯 Profil climatique normalisé"
+fig_radar = figure(
+    traces_radar,
+    type_="polaire",
+    titre="🎯 Profil climatique normalisé",
+    polar=dict(radialaxis={"visible": True, "range": [0, 1], "gridcolor": GRILLE, "linecolor": GRILLE}),
+    legend=dict(title={"text": "Département"})
 )
 
 st.plotly_chart(fig_radar)
@@ -502,24 +436,13 @@ df_annual = df_annual[df_annual["DEPARTEMENT"].isin(selected_deps_str)]
 with col5:
     temp_annual = df_annual.groupby(["annee", "DEPARTEMENT"])["T"].mean().reset_index()
     
-    fig_temp_annual = px.line(
-        temp_annual,
-        x="annee",
-        y="T",
-        color="DEPARTEMENT",
-        markers=True,
-        title="🌡️ Température moyenne annuelle"
-    )
-    fig_temp_annual.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis_title="Année",
-        yaxis_title="Température (°C)",
-        font=dict(family="Poppins", color="#e8e8e8"),
-        xaxis=dict(gridcolor='rgba(255,255,255,0.1)', dtick=1),
-        yaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-        legend=dict(title="Département", bgcolor='rgba(0,0,0,0.3)')
+    fig_temp_annual = figure(
+        par_groupe(temp_annual, "DEPARTEMENT", ligne, "annee", "T", marqueurs=True, largeur=2, taille=6),
+        titre="🌡️ Température moyenne annuelle",
+        x="Année",
+        y="Température (°C)",
+        xaxis=dict(dtick=1),
+        legend=dict(title={"text": "Département"})
     )
     st.plotly_chart(fig_temp_annual)
 
@@ -527,27 +450,25 @@ with col6:
     precip_annual = df_annual.groupby(["annee", "DEPARTEMENT", "NUM_POSTE"])["RR1"].sum().reset_index()
     precip_annual = precip_annual.groupby(["annee", "DEPARTEMENT"])["RR1"].mean().reset_index()
     
-    fig_precip_annual = px.line(
-        precip_annual,
-        x="annee",
-        y="RR1",
-        color="DEPARTEMENT",
-        markers=True,
-        title="🌧️ Précipitations annuelles"
-    )
-    fig_precip_annual.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis_title="Année",
-        yaxis_title="Précipitations (mm)",
-        font=dict(family="Poppins", color="#e8e8e8"),
-        xaxis=dict(gridcolor='rgba(255,255,255,0.1)', dtick=1),
-        yaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-        legend=dict(title="Département", bgcolor='rgba(0,0,0,0.3)')
+    fig_precip_annual = figure(
+        par_groupe(precip_annual, "DEPARTEMENT", ligne, "annee", "RR1", marqueurs=True, largeur=2, taille=6),
+        titre="🌧️ Précipitations annuelles",
+        x="Année",
+        y="Précipitations (mm)",
+        xaxis=dict(dtick=1),
+        legend=dict(title={"text": "Département"})
     )
     st.plotly_chart(fig_precip_annual)
 
+# =====================
+# EXPORT (écriture par lots Arrow, au clic)
+# =====================
+with st.expander("💾 Exporter la sélection"):
+    st.markdown("**Observations des départements comparés**")
+    boutons_export(df_compare, f"comparaison_{selected_year}_{month}", "comparaison_obs", complet=True)
+    st.markdown("**Tableau comparatif**")
+    boutons_export(comparaison(df_compare), f"tableau_comparatif_{selected_year}_{month}", "comparaison_stats")
+
 # =====================
 # FOOTER
 # =====================
@@ -0,0 +1,199 @@
+import streamlit as st
+import pandas as pd
+
+from utils.donnees import load_index_stations, load_catalogue_stations
+from utils.echantillonnage import reduire
+from utils.export import boutons_export
+from utils.figures import barres, figure, ligne
+from utils.stations import serie_station
+
+# =====================
+# CONFIGURATION PAGE
+# =====================
+st.set_page_config(
+    page_title="Fiche Station",
+    page_icon="📍",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# CSS moderne
+st.markdown("""
+<style>
+    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;700&display=swap');
+
+    /* Cacher le menu de navigation automatique de Streamlit */
+    [data-testid="stSidebarNav"] {
+        display: none !important;
+    }
+
+    .stApp {
+        background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
+    }
+
+    [data-testid="stSidebar"] {
+        background: linear-gradient(180deg, #0f3460 0%, #1a1a2e 100%);
+        border-right: 1px solid rgba(255,255,255,0.1);
+    }
+
+    h1, h2, h3 {
+        font-family: 'Poppins', sans-serif !important;
+        background: linear-gradient(90deg, #00d2ff, #3a7bd5);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        font-weight: 700 !important;
+    }
+
+    .main-title {
+        text-align: center;
+        padding: 30px;
+        background: linear-gradient(135deg, rgba(0,210,255,0.1) 0%, rgba(58,123,213,0.1) 100%);
+        border-radius: 20px;
+        border: 1px solid rgba(255,255,255,0.1);
+        margin-bottom: 30px;
+    }
+
+    .main-title h1 {
+        font-size: 2.5rem !important;
+        margin: 0 !important;
+    }
+</style>
+""", unsafe_allow_html=True)
+
+# =====================
+# CHARGEMENT DONNÉES
+# =====================
+# Manifeste : seules ces colonnes sont lues (les autres, au clic d'export)
+COLONNES = ("NUM_POSTE", "date", "T", "TX", "TN", "RR1", "U", "FF", "FXI", "annee")
+df_stations, bornes_stations = load_index_stations(COLONNES)
+catalogue = load_catalogue_stations().set_index("NUM_POSTE").sort_values("NOM_USUEL")
+
+# =====================
+# SIDEBAR
+# =====================
+with st.sidebar:
+    st.markdown("""
+        <div style="text-align: center; padding: 20px 0;">
+            <span style="font-size: 3rem;">🌦️</span>
+            <h2 style="margin: 10px 0; font-size: 1.5rem;">GeoMétéo</h2>
+            <p style="color: #888; font-size: 0.8rem;">Dashboard M2 GMS</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("---")
+
+    # Navigation personnalisée
+    st.markdown("""
+        <p style="color: #00d2ff; font-size: 0.9rem; margin-bottom: 15px; padding-left: 5px;">📍 Navigation</p>
+    """, unsafe_allow_html=True)
+
+    st.page_link("app.py", label="🏠 Accueil")
+    st.page_link("pages/1_Carte.py", label="🗺️ Carte")
+    st.page_link("pages/2_Analyses.py", label="📈 Analyses")
+    st.page_link("pages/3_Comparaison.py", label="🔄 Comparaison")
+    st.page_link("pages/4_Station.py", label="📍 Station")
+
+    st.markdown("---")
+
+    st.markdown("### 📍 Station")
+    # Station pré-sélectionnée par un clic sur la carte (1_Carte.py)
+    postes = list(catalogue.index)
+    if st.session_state.get("station") not in postes:
+        st.session_state["station"] = postes[0]
+    poste = st.selectbox(
+        "Station météo",
+        options=postes,
+        key="station",
+        format_func=lambda x: f"📍 {catalogue.loc[x, 'NOM_USUEL']} ({catalogue.loc[x, 'DEPARTEMENT']})"
+    )
+
+# =====================
+# SÉRIE DE LA STATION (tranche de l'index, sans filtrage)
+# =====================
+info = catalogue.loc[poste]
+df_station = serie_station(df_stations, bornes_stations, poste)
+
+# =====================
+# TITRE
+# =====================
+st.markdown(f"""
+    <div class="main-title">
+        <h1>📍 {info['NOM_USUEL']}</h1>
+        <p style="color: #a0a0a0;">Département {info['DEPARTEMENT']} • {info['LAT']:.2f}°N, {info['LON']:.2f}°E • {info['ALTI']} m</p>
+    </div>
+""", unsafe_allow_html=True)
+
+s1, s2, s3, s4 = st.columns(4)
+with s1:
+    st.metric("📅 Période", f"{info['debut']:%Y} – {info['fin']:%Y}", delta=f"{info['observations']:,} observations")
+with s2:
+    st.metric("🌡️ T° Moy", f"{df_station['T'].mean():.1f} °C", delta=f"Max: {df_station['TX'].max():.1f}°C")
+with s3:
+    precip_annuelle = df_station.groupby("annee")["RR1"].sum().mean()
+    st.metric("🌧️ Précip. annuelles", f"{precip_annuelle:.0f} mm", delta="Moyenne/an")
+with s4:
+    st.metric("💨 Vent Moy", f"{df_station['FF'].mean():.1f} m/s", delta=f"Rafale max: {df_station['FXI'].max():.1f} m/s")
+
+# =====================
+# HISTORIQUE COMPLET
+# =====================
+st.markdown("### 📈 Historique Complet")
+
+date_min, date_max = df_station["date"].min().date(), df_station["date"].max().date()
+zoom = st.slider("🔍 Période affichée", min_value=date_min, max_value=date_max, value=(date_min, date_max), format="DD/MM/YYYY")
+df_zoom = df_station[df_station["date"].between(pd.Timestamp(zoom[0]), pd.Timestamp(zoom[1]))]
+
+# --- Températures ---
+traces = []
+for col, nom, couleur in [("TX", "T° max", "#ff6b6b"), ("T", "T° moyenne", "#ffd700"), ("TN", "T° min", "#3a7bd5")]:
+    serie = reduire(df_zoom, "date", col, methode="minmax")
+    traces.append(ligne(serie["date"], serie[col], couleur, nom, largeur=1.5))
+st.plotly_chart(figure(traces, titre="🌡️ Températures", y="Température (°C)"))
+
+col1, col2 = st.columns(2)
+
+# --- Précipitations ---
+with col1:
+    precip = reduire(df_zoom, "date", "RR1", methode="minmax")
+    st.plotly_chart(figure(
+        [barres(precip["date"], precip["RR1"], "#4ecdc4")],
+        titre="🌧️ Précipitations", y="Précipitations (mm)",
+    ))
+
+# --- Humidité ---
+with col2:
+    if df_zoom["U"].notna().any():
+        humid = reduire(df_zoom, "date", "U")
+        st.plotly_chart(figure(
+            [ligne(humid["date"], humid["U"], "#667eea", largeur=1.5)],
+            titre="💧 Humidité", y="Humidité (%)",
+        ))
+    else:
+        st.warning("⚠️ Pas de mesure d'humidité pour cette station")
+
+# =====================
+# EXPORT (écriture par lots Arrow, au clic)
+# =====================
+with st.expander("💾 Exporter l'historique"):
+    boutons_export(df_station, f"station_{poste}", "station", complet=True)
+
+# =====================
+# FOOTER
+# =====================
+st.markdown("<br>", unsafe_allow_html=True)
+st.markdown("""
+    <div style="
+        text-align: center;
+        padding: 20px;
+        background: rgba(255,255,255,0.03);
+        border-radius: 15px;
+        border: 1px solid rgba(255,255,255,0.05);
+    ">
+        <p style="color: #666; margin: 0; font-size: 0.85rem;">
+            📍 Fiche station : <strong>Plotly</strong> |
+            💾 Données : <strong>Météo-France</strong> |
+            🎓 Master 2 GMS: Projet Géodata-Visualisation
+            👩‍💻 <strong style="color: #00d2ff;">Alia AL MOBARIK</strong>
+        </p>
+    </div>
+""", unsafe_allow_html=True)
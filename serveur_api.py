@@ -0,0 +1,14 @@
+from utils import api
+
+# =====================
+# API DES AGRÉGATS DU DASHBOARD (JSON / Arrow IPC)
+# =====================
+# Usage : python serveur_api.py
+#   GET /kpis?annee=2023&mois=7&departement=13
+#   GET /series/annuelles?departement=4,5
+#   GET /series/mensuelles?annee=2022
+#   GET /comparaison?annee=2023&departement=6,13,83&format=arrow
+#   GET /quantiles?variable=T&annee=2023&q=0.1,0.5,0.9
+# Paramètre non accepté par la route ou invalide : 400.
+if __name__ == "__main__":
+    api.servir()
@@ -0,0 +1,8 @@
+from utils import tuiles
+
+# =====================
+# SERVEUR LOCAL DE TUILES VECTORIELLES
+# =====================
+# Usage : python build_data.py tuiles && python serveur_tuiles.py
+if __name__ == "__main__":
+    tuiles.servir()
@@ -0,0 +1,111 @@
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pyarrow as pa
+import pytest
+
+from utils import api
+from utils.api import ROUTES, TYPE_ARROW, _GestionnaireAPI
+
+
+@pytest.fixture(scope="module")
+def serveur():
+    serveur = ThreadingHTTPServer(("127.0.0.1", 0), _GestionnaireAPI)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    yield serveur.server_port
+    serveur.shutdown()
+
+
+@pytest.fixture
+def obtenir(serveur):
+    def obtenir(chemin, **entetes):
+        connexion = http.client.HTTPConnection("127.0.0.1", serveur)
+        connexion.request("GET", chemin, headers=entetes)
+        reponse = connexion.getresponse()
+        corps = reponse.read()
+        connexion.close()
+        return reponse.status, reponse.headers, corps
+    return obtenir
+
+
+PARAMETRES_ROUTES = {
+    "/kpis": "annee=2023&mois=7&departement=13,84",
+    "/series/annuelles": "departement=13",
+    "/series/mensuelles": "annee=2022&departement=13,84",
+    "/comparaison": "annee=2023&mois=1",
+    "/quantiles": "annee=2023&departement=13&variable=T&q=0.1,0.5,0.9",
+}
+
+
+def test_index_des_routes(obtenir):
+    code, _, corps = obtenir("/")
+    assert code == 200 and json.loads(corps) == sorted(ROUTES)
+
+
+@pytest.mark.parametrize("route", sorted(ROUTES))
+def test_routes_json_et_arrow(obtenir, route):
+    chemin = f"{route}?{PARAMETRES_ROUTES[route]}"
+    code, entetes, corps = obtenir(chemin, Accept="application/json")
+    assert code == 200 and entetes["Content-Type"] == "application/json"
+    lignes = json.loads(corps)
+    assert lignes
+
+    code, entetes, corps = obtenir(chemin, Accept=TYPE_ARROW)
+    assert code == 200 and entetes["Content-Type"] == TYPE_ARROW
+    table = pa.ipc.open_stream(corps).read_all()
+    assert table.num_rows == (1 if isinstance(lignes, dict) else len(lignes))
+
+
+def test_quantiles_croissants(obtenir):
+    _, _, corps = obtenir(f"/quantiles?{PARAMETRES_ROUTES['/quantiles']}")
+    valeurs = [ligne["T"] for ligne in json.loads(corps)]
+    assert valeurs == sorted(valeurs)
+
+
+@pytest.mark.parametrize("chemin", [
+    "/kpis?annee=2023&q=0.5",               # paramètre d'une autre route
+    "/comparaison?variable=U",
+    "/series/annuelles?annee=2023",
+    "/kpis?annee=deux-mille",               # valeur invalide
+    "/quantiles?q=1.5",
+    "/quantiles?variable=inconnue",
+])
+def test_parametres_invalides(obtenir, chemin):
+    code, _, corps = obtenir(chemin)
+    assert code == 400 and "erreur" in json.loads(corps)
+
+
+def test_route_inconnue(obtenir):
+    code, _, _ = obtenir("/inconnue")
+    assert code == 404
+
+
+def test_erreur_de_route(obtenir, monkeypatch):
+    def en_erreur(df, annee=None):
+        raise RuntimeError("échec")
+
+    monkeypatch.setitem(ROUTES, "/kpis", en_erreur)
+    api._reponse.cache_clear()
+    code, _, corps = obtenir("/kpis?annee=2021")
+    assert code == 500 and "erreur" in json.loads(corps)
+    api._reponse.cache_clear()
+
+
+@pytest.mark.parametrize("accept", ["application/json", TYPE_ARROW])
+def test_etag_et_304(obtenir, accept):
+    chemin = "/series/annuelles?departement=13"
+    code, entetes, corps = obtenir(chemin, Accept=accept)
+    assert code == 200 and entetes["Vary"] == "Accept" and entetes["ETag"]
+    tag = entetes["ETag"]
+
+    code, entetes, corps = obtenir(chemin, Accept=accept, **{"If-None-Match": tag})
+    assert code == 304 and corps == b"" and entetes["Vary"] == "Accept" and entetes["ETag"] == tag
+
+    # Autres paramètres ou autre format : autre ETag, réponse complète
+    code, _, _ = obtenir("/series/annuelles?departement=84", Accept=accept, **{"If-None-Match": tag})
+    assert code == 200
+    autre = "application/json" if accept == TYPE_ARROW else TYPE_ARROW
+    code, entetes, _ = obtenir(chemin, Accept=autre, **{"If-None-Match": tag})
+    assert code == 200 and entetes["ETag"] != tag
@@ -0,0 +1,56 @@
+import folium
+from streamlit.testing.v1 import AppTest
+
+from utils.carte import copie_carte
+
+
+def carte_de_base():
+    m = folium.Map(location=[44, 6], zoom_start=8, tiles="OpenStreetMap")
+    folium.GeoJson({"type": "FeatureCollection", "features": [
+                       {"type": "Feature", "properties": {"nom": "A"},
+                        "geometry": {"type": "Polygon", "coordinates": [[[6, 44], [6.2, 44], [6.1, 44.2], [6, 44]]]}}]},
+                   tooltip=folium.GeoJsonTooltip(fields=["nom"])).add_to(m)
+    return m
+
+
+def arbre(element):
+    return {nom: (enfant._id, arbre(enfant)) for nom, enfant in element._children.items()}
+
+
+def test_copie_independante():
+    m = carte_de_base()
+    avant = arbre(m)
+    copie = copie_carte(m)
+    folium.FeatureGroup(name="couche").add_to(copie)
+    copie.get_root().render()
+
+    assert arbre(m) == avant
+    assert copie.get_root() is not m.get_root()
+    geojson = next(e for e in copie._children.values() if isinstance(e, folium.GeoJson))
+    assert geojson.data is next(e for e in m._children.values() if isinstance(e, folium.GeoJson)).data
+
+
+def app():
+    import folium
+    import streamlit as st
+
+    from tests.test_carte import arbre, carte_de_base
+    from utils.carte import afficher_carte
+
+    @st.cache_resource
+    def base():
+        return carte_de_base()
+
+    m = base()
+    st.session_state.setdefault("avant", arbre(m))
+    couche = folium.FeatureGroup(name="📍 Stations")
+    folium.CircleMarker([44.1, 6.1], radius=5).add_to(couche)
+    afficher_carte(m, [couche], key="carte")
+    st.session_state["apres"] = arbre(m)
+
+
+def test_carte_en_cache_non_modifiee():
+    at = AppTest.from_function(app).run()
+    at.run()
+    assert not at.exception
+    assert at.session_state["apres"] == at.session_state["avant"]
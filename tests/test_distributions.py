@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.distributions import COEF_IQR, resume_boites, traces_boites
+
+
+@pytest.fixture(scope="module")
+def df():
+    rng = np.random.default_rng(0)
+    groupes = np.repeat([4, 5, 13, 84], [300, 120, 500, 7])
+    valeurs = rng.standard_t(3, len(groupes)) * 4 + groupes / 10
+    valeurs[rng.random(len(valeurs)) < 0.05] = np.nan
+    return pd.DataFrame({"DEPARTEMENT": groupes, "T": valeurs})
+
+
+def stats_brutes(x):
+    """Statistiques d'une boîte Plotly sur les observations brutes (quartiles linéaires)."""
+    q1, mediane, q3 = np.quantile(x, [0.25, 0.5, 0.75])
+    bas, haut = q1 - COEF_IQR * (q3 - q1), q3 + COEF_IQR * (q3 - q1)
+    dedans = x[(x >= bas) & (x <= haut)]
+    return {"n": len(x), "q1": q1, "mediane": mediane, "q3": q3, "bas": dedans.min(), "haut": dedans.max(),
+            "moyenne": x.mean(), "aberrants": np.sort(x[(x < bas) | (x > haut)])}
+
+
+def test_resume_egal_aux_stats_brutes(df):
+    resume, aberrants = resume_boites(df, "DEPARTEMENT", "T", max_aberrants=10_000)
+    assert list(resume["DEPARTEMENT"]) == [4, 5, 13, 84]
+    for ligne in resume.itertuples(index=False):
+        x = df.loc[df["DEPARTEMENT"] == ligne.DEPARTEMENT, "T"].dropna().to_numpy()
+        attendu = stats_brutes(x)
+        for cle in ("n", "q1", "mediane", "q3", "bas", "haut", "moyenne"):
+            assert getattr(ligne, cle) == pytest.approx(attendu[cle]), cle
+        np.testing.assert_array_equal(
+            np.sort(aberrants.loc[aberrants["DEPARTEMENT"] == ligne.DEPARTEMENT, "T"].to_numpy()),
+            attendu["aberrants"],
+        )
+
+
+def test_aberrants_limites_aux_plus_eloignes(df):
+    _, tous = resume_boites(df, "DEPARTEMENT", "T", max_aberrants=10_000)
+    resume, limites = resume_boites(df, "DEPARTEMENT", "T", max_aberrants=3)
+    medianes = resume.set_index("DEPARTEMENT")["mediane"]
+    for dep, points in tous.groupby("DEPARTEMENT"):
+        ecarts = (points["T"] - medianes[dep]).abs().sort_values(ascending=False)
+        garde = limites.loc[limites["DEPARTEMENT"] == dep, "T"]
+        assert len(garde) == min(3, len(points))
+        assert sorted((garde - medianes[dep]).abs()) == sorted(ecarts.iloc[:3])
+
+
+def test_traces_portent_le_resume(df):
+    resume, aberrants = resume_boites(df, "DEPARTEMENT", "T")
+    traces = traces_boites(resume, aberrants, "DEPARTEMENT", "T", ["#a", "#b"])
+    boites = [t for t in traces if t["type"] == "box"]
+    assert [t["name"] for t in boites] == ["4", "5", "13", "84"]
+    assert [t["marker"]["color"] for t in boites] == ["#a", "#b", "#a", "#b"]
+    for boite, ligne in zip(boites, resume.itertuples(index=False)):
+        for cle, colonne in [("q1", "q1"), ("median", "mediane"), ("q3", "q3"),
+                             ("lowerfence", "bas"), ("upperfence", "haut"), ("mean", "moyenne")]:
+            assert boite[cle][0] == pytest.approx(getattr(ligne, colonne), rel=1e-6)
+    points = [t for t in traces if t["type"] == "scatter"]
+    assert sum(len(t["y"]) for t in points) == len(aberrants)
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import esquisses
+
+# =====================
+# PRÉCISION DES ESQUISSES DE QUANTILES
+# =====================
+# Sur un échantillon tiré avec une graine fixe, les quantiles fusionnés
+# doivent rester à moins de N / (2K) + C rangs de ceux des observations
+# (borne documentée dans utils/esquisses.py).
+QUANTILES = np.array([0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99])
+TIRAGES = 100
+
+
+@pytest.fixture(scope="module")
+def df():
+    """Observations journalières synthétiques : cellules de 5 à 366 valeurs, lacunes et ex aequo."""
+    rng = np.random.default_rng(0)
+    lignes = []
+    for poste in range(40):
+        for annee in (2021, 2022, 2023):
+            n = int(rng.integers(5, 367))
+            lignes.append(pd.DataFrame({
+                "NUM_POSTE": poste,
+                "DEPARTEMENT": (4, 5, 6, 13)[poste % 4],
+                "annee": annee,
+                "T": rng.normal(15 + poste % 7, 6, n),
+                "RR1": np.where(rng.random(n) < 0.7, 0.0, rng.gamma(0.8, 8, n).round(1)),
+                "U": rng.uniform(20, 100, n).round(),
+                "FF": np.where(rng.random(n) < 0.1, np.nan, rng.weibull(2, n) * 5),
+            }))
+    return pd.concat(lignes, ignore_index=True)
+
+
+def erreur_rang(x, estimes, qs):
+    """Écart maximal, en rangs, entre la position des estimations et les rangs visés."""
+    x = np.sort(x)
+    bas = np.searchsorted(x, estimes, side="left")
+    haut = np.searchsorted(x, estimes, side="right")
+    cibles = np.ceil(qs * len(x))
+    # L'estimation convient à tout rang de [bas, haut] (valeurs égales)
+    return np.maximum(0, np.maximum(bas - cibles, cibles - haut)).max()
+
+
+def selections(df):
+    rng = np.random.default_rng(1)
+    annees, deps = df["annee"].unique(), df["DEPARTEMENT"].unique()
+    for _ in range(TIRAGES):
+        yield {
+            "annee": int(rng.choice(annees)) if rng.random() < 0.8 else None,
+            "departements": tuple(int(d) for d in rng.choice(deps, rng.integers(1, len(deps) + 1), replace=False)),
+        }
+
+
+@pytest.mark.parametrize("k", [4, 8, 16, esquisses.K])
+def test_borne_erreur_de_rang(df, k):
+    sk = esquisses.construire(df, k=k)
+    for filtres in selections(df):
+        masque = esquisses.selection(sk, **filtres)
+        sel = df if filtres["annee"] is None else df[df["annee"] == filtres["annee"]]
+        sel = sel[sel["DEPARTEMENT"].isin(filtres["departements"])]
+        for variable in esquisses.VARIABLES:
+            x = sel[variable].dropna().to_numpy(np.float32)
+            poids = sk[f"{variable}_poids"][masque]
+            # Cellules pondérées (poids n / K) : celles dont la taille dépasse le nombre de représentants
+            compressees = np.count_nonzero(np.round(poids.sum(axis=1)) > np.count_nonzero(poids > 0, axis=1))
+            borne = len(x) / (2 * k) + compressees
+            erreur = erreur_rang(x, esquisses.quantiles(sk, variable, QUANTILES, masque), QUANTILES)
+            assert erreur <= borne, (variable, filtres, erreur, borne)
+
+
+def test_cellules_ponderees(df):
+    # Avec K = 4, toute cellule de plus de 4 valeurs est compressée : poids n / K, somme n
+    sk = esquisses.construire(df, k=4)
+    n = df.groupby(esquisses.CLES)["T"].count().to_numpy()
+    poids = sk["T_poids"]
+    assert (n > 4).all()
+    np.testing.assert_allclose(poids.sum(axis=1), n, rtol=1e-5)
+    np.testing.assert_allclose(poids, np.repeat((n / 4)[:, None], 4, axis=1), rtol=1e-6)
+
+
+def test_cellules_exactes(df):
+    # K au moins égal à la taille des cellules : quantiles exacts
+    sk = esquisses.construire(df, k=366)
+    masque = esquisses.selection(sk, annee=2022, departements=(4, 13))
+    sel = df[(df["annee"] == 2022) & df["DEPARTEMENT"].isin((4, 13))]
+    for variable in esquisses.VARIABLES:
+        x = sel[variable].dropna().to_numpy(np.float32)
+        np.testing.assert_array_equal(
+            esquisses.quantiles(sk, variable, QUANTILES, masque),
+            np.quantile(x, QUANTILES, method="inverted_cdf"),
+        )
+
+
+def test_selection_vide(df):
+    sk = esquisses.construire(df)
+    assert np.isnan(esquisses.quantiles(sk, "T", QUANTILES, esquisses.selection(sk, annee=1999))).all()
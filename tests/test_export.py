@@ -0,0 +1,76 @@
+import io
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import pytest
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+from utils import export
+from utils.donnees import colonnes_donnees, load_data
+from utils.export import FORMATS, exporteur
+
+
+@pytest.fixture(scope="module")
+def df():
+    # Colonnes réellement chargées par les pages (manifeste du fichier), une ligne sur 200
+    return load_data(colonnes_donnees()).iloc[::200]
+
+
+@pytest.fixture(autouse=True)
+def petits_lots(monkeypatch):
+    # Plusieurs lots même sur l'échantillon
+    monkeypatch.setattr(export, "TAILLE_BLOC", 97)
+
+
+def executer(ecrire, format_):
+    """Passe ``ecrire`` par le chemin d'un clic sur ``st.download_button``, renvoie les octets servis."""
+    stockage = MemoryMediaFileStorage("/media")
+    gestionnaire = MediaFileManager(stockage)
+    id_ = gestionnaire.add_deferred(ecrire, FORMATS[format_]["mime"], f"export.{format_}")
+    url = gestionnaire.execute_deferred(id_)
+    return stockage.get_file(url.rsplit("/", 1)[-1].split(".")[0]).content
+
+
+def attendu(df):
+    return df.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("format_", list(FORMATS))
+def test_exporteur_accepte_par_streamlit(df, format_):
+    contenu = executer(exporteur(df, format_), format_)
+    assert isinstance(contenu, bytes) and contenu
+
+
+def test_parquet_relu(df):
+    relu = pq.read_table(io.BytesIO(executer(exporteur(df, "parquet"), "parquet"))).to_pandas()
+    pd.testing.assert_frame_equal(relu, attendu(df))
+
+
+def test_csv_relu(df):
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    options = pacsv.ConvertOptions(column_types=dict(zip(schema.names, schema.types)))
+    relu = pacsv.read_csv(io.BytesIO(executer(exporteur(df, "csv"), "csv")), convert_options=options).to_pandas()
+    pd.testing.assert_frame_equal(relu, attendu(df))
+
+
+def test_geojson_relu(df):
+    contenu = json.loads(executer(exporteur(df, "geojson"), "geojson"))
+    assert len(contenu["features"]) == len(df)
+    assert [f["geometry"]["coordinates"] for f in contenu["features"]] == df[["LON", "LAT"]].values.tolist()
+    assert list(contenu["features"][0]["properties"]) == [c for c in df.columns if c not in ("LAT", "LON")]
+
+
+def test_complet(df):
+    # Page n'ayant chargé que quelques colonnes : les autres sont ajoutées au clic
+    partiel = df[["NUM_POSTE", "date", "T"]]
+    relu = pq.read_table(io.BytesIO(executer(exporteur(partiel, "parquet", complet=True), "parquet"))).to_pandas()
+    pd.testing.assert_frame_equal(relu, attendu(df))
+
+
+def test_selection_vide(df):
+    relu = pq.read_table(io.BytesIO(executer(exporteur(df.iloc[:0], "parquet"), "parquet"))).to_pandas()
+    assert relu.empty and list(relu.columns) == list(df.columns)
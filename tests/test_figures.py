@@ -0,0 +1,13 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from utils import figures
+
+
+def test_series_envoyees_en_typed_arrays():
+    x = pd.date_range("2020-01-01", periods=5).values
+    trace = json.loads(figures.figure([figures.ligne(x, np.arange(5.0) + 0.5)]).to_json())["data"][0]
+    assert trace["y"]["dtype"] == "f4" and "bdata" in trace["y"]
+    assert trace["x"]["dtype"] == "f8" and "bdata" in trace["x"]
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+
+
+@pytest.fixture
+def app():
+    at = AppTest.from_file(APP, default_timeout=300).run()
+    return at.switch_page("pages/2_Analyses.py").run()
+
+
+def test_saisies_successives_conservees(app):
+    for annee in (2021, 2020):
+        app.sidebar.select_slider[0].set_value(annee).run()
+        assert app.sidebar.select_slider[0].value == annee
+    for mois in (3, 5):
+        app.sidebar.selectbox[0].set_value(mois).run()
+        assert app.sidebar.selectbox[0].value == mois
+    assert not app.exception
+
+
+def test_filtres_partages_entre_pages(app):
+    app.sidebar.selectbox[0].set_value(5).run()
+    app.switch_page("pages/3_Comparaison.py").run()
+    assert app.sidebar.selectbox[-1].value == 5
+
+    app.sidebar.select_slider[0].set_value(2022).run()
+    app.switch_page("pages/2_Analyses.py").run()
+    assert app.sidebar.select_slider[0].value == 2022
+    assert app.session_state["filtres"]["annee"] == 2022
+    assert not app.exception
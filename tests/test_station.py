@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+
+
+def test_selections_successives():
+    at = AppTest.from_file(APP, default_timeout=300).run()
+    at.switch_page("pages/4_Station.py").run()
+    for poste in (4039001, 4096002):
+        at.sidebar.selectbox[0].set_value(poste).run()
+        assert at.sidebar.selectbox[0].value == poste
+    assert not at.exception
+
+
+def test_station_preselectionnee():
+    # Comme après un clic sur la carte (1_Carte.py)
+    at = AppTest.from_file(APP, default_timeout=300).run()
+    at.session_state["station"] = 4096002
+    at.switch_page("pages/4_Station.py").run()
+    assert at.sidebar.selectbox[0].value == 4096002
+    assert not at.exception
@@ -0,0 +1,35 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from utils.tuiles import options_vectorgrid
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node absent")
+
+
+def styles(options, couche, proprietes):
+    """Styles rendus par la fonction de style JS de ``couche`` pour chaque entité."""
+    script = f"var o = {options};\n" + "".join(
+        f"console.log(JSON.stringify(o.vectorTileLayerStyles.{couche}({json.dumps(p)})));\n" for p in proprietes
+    )
+    sortie = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout
+    return [json.loads(ligne) for ligne in sortie.splitlines()]
+
+
+def test_carte_de_base_sans_stations():
+    options = options_vectorgrid()
+    assert styles(options, "stations", [{"NUM_POSTE": 13001009, "DEPARTEMENT": 13}]) == [[]]
+    assert styles(options, "departements", [{"dep": 13}])[0]
+
+
+def test_stations_filtrees_cote_client():
+    options = options_vectorgrid(13, [13001009, 84007004])
+    rendus = styles(options, "stations", [
+        {"NUM_POSTE": 13001009, "DEPARTEMENT": 13},      # station filtrée, département choisi
+        {"NUM_POSTE": 13004003, "DEPARTEMENT": 13},      # hors période ou incomplète
+        {"NUM_POSTE": 84007004, "DEPARTEMENT": 84},      # autre département
+    ])
+    assert [bool(r) for r in rendus] == [True, False, False]
+    assert styles(options, "departements", [{"dep": 13}]) == [[]]
@@ -0,0 +1,39 @@
+import numpy as np
+
+from utils.glissant import VARIABLES
+
+# =====================
+# FRAMES PRÉ-CALCULÉES (animation côté client)
+# =====================
+# Une année = une matrice (pas de temps × station) en float32 et les
+# positions des stations, calculées une fois ; la carte animée embarque
+# toutes les frames et les rejoue dans le navigateur, sans aller-retour.
+PAS = {"mois": "M", "jour": "D"}
+
+
+def frames(df, variable, pas="mois"):
+    """Étiquettes des pas de temps, stations, positions (n_stations × 2) et valeurs (n_pas × n_stations)."""
+    periode = df["date"].dt.to_period(PAS[pas]).rename("periode")
+    table = df.groupby([periode, "NUM_POSTE"])[variable].agg(VARIABLES.get(variable, "mean")).unstack("NUM_POSTE")
+    positions = df.drop_duplicates("NUM_POSTE").set_index("NUM_POSTE").loc[table.columns, ["LAT", "LON"]]
+    return (
+        table.index.astype(str).tolist(),
+        table.columns.to_numpy(),
+        positions.to_numpy(np.float32),
+        table.to_numpy(np.float32),
+    )
+
+
+def donnees_heatmap(positions, valeurs):
+    """Données ``HeatMapWithTime`` : une liste [lat, lon, poids] par frame.
+
+    Les poids sont ramenés sur [0, 1] avec les extrema de toute l'année,
+    pour que les frames restent comparables entre elles.
+    """
+    vmin, vmax = np.nanmin(valeurs), np.nanmax(valeurs)
+    poids = np.round((valeurs - vmin) / (vmax - vmin if vmax > vmin else 1), 3)
+    lat, lon = np.round(positions[:, 0], 3).tolist(), np.round(positions[:, 1], 3).tolist()
+    return [
+        [[lat[i], lon[i], float(p)] for i, p in enumerate(ligne) if np.isfinite(p)]
+        for ligne in poids
+    ]
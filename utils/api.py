@@ -0,0 +1,233 @@
+import hashlib
+import inspect
+import json
+import math
+import os
+import threading
+import traceback
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils import esquisses, indicateurs
+from utils.donnees import DATA_PATH, lire_donnees, lire_esquisses
+
+# =====================
+# PARAMÈTRES
+# =====================
+PORT = 8766
+TAILLE_CACHE = 256
+TYPE_ARROW = "application/vnd.apache.arrow.stream"
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+# =====================
+# DONNÉES (rechargées si le fichier source change)
+# =====================
+_verrou = threading.Lock()
+_etat = {"version": None, "df": None, "esquisses": None}
+
+
+def version_donnees():
+    """Identifiant de version des données : sert de base aux ETag."""
+    return str(os.path.getmtime(DATA_PATH))
+
+
+def _donnees(version):
+    with _verrou:
+        if _etat["version"] != version:
+            _etat["df"], _etat["version"] = lire_donnees(), version
+            _etat["esquisses"] = None
+            _reponse.cache_clear()
+        return _etat["df"]
+
+
+def _esquisses():
+    # Chargées à la première requête de quantiles (après _donnees)
+    with _verrou:
+        if _etat["esquisses"] is None:
+            _etat["esquisses"] = lire_esquisses(_etat["df"])
+        return _etat["esquisses"]
+
+
+def _tranche(df, annee=None, mois=None, departements=None):
+    if annee is not None:
+        df = df[df["annee"] == annee]
+    if mois is not None:
+        df = df[df["mois"] == mois]
+    if departements:
+        df = df[df["DEPARTEMENT"].isin(departements)]
+    return df
+
+
+# =====================
+# ROUTES
+# =====================
+# Chaque route reçoit les observations et les paramètres de requête déjà
+# typés, et renvoie un DataFrame (ou un dict pour une seule ligne). Les
+# paramètres acceptés sont ceux de sa signature : tout autre paramètre
+# est refusé (400).
+def _kpis(df, annee=None, mois=None, departements=None):
+    return indicateurs.kpis(_tranche(df, annee, mois, departements))
+
+
+def _series_annuelles(df, departements=None):
+    return indicateurs.serie(_tranche(df, departements=departements), ["annee"])
+
+
+def _series_mensuelles(df, annee=None, departements=None):
+    return indicateurs.serie(_tranche(df, annee, departements=departements), ["mois"])
+
+
+def _comparaison(df, annee=None, mois=None, departements=None):
+    return indicateurs.comparaison(_tranche(df, annee, mois, departements))
+
+
+def _quantiles(df, annee=None, mois=None, departements=None, variable="T", q=QUANTILES):
+    if mois is not None:
+        # Un mois de station tient en quelques dizaines de valeurs : calcul direct, exact
+        x = _tranche(df, annee, mois, departements)[variable].dropna().to_numpy()
+        valeurs = np.quantile(x, q, method="inverted_cdf") if len(x) else np.full(len(q), np.nan)
+    else:
+        # Fusion des esquisses par cellule (station, année) : pas de lecture des observations
+        sk = _esquisses()
+        valeurs = esquisses.quantiles(sk, variable, q, esquisses.selection(sk, annee, departements))
+    return pd.DataFrame({"q": q, variable: np.round(valeurs, 4)})
+
+
+ROUTES = {
+    "/kpis": _kpis,
+    "/series/annuelles": _series_annuelles,
+    "/series/mensuelles": _series_mensuelles,
+    "/comparaison": _comparaison,
+    "/quantiles": _quantiles,
+}
+PARAMETRES = {route: set(list(inspect.signature(f).parameters)[1:]) for route, f in ROUTES.items()}
+
+
+def _parametres(route, requete):
+    """annee, mois (entiers), departements (liste d'entiers séparés par des virgules),
+    variable et q (quantiles entre 0 et 1, séparés par des virgules) pour /quantiles.
+
+    ``ValueError`` si une valeur est invalide ou si la route n'accepte pas le paramètre.
+    """
+    params = {}
+    for nom in ("annee", "mois"):
+        if nom in requete:
+            params[nom] = int(requete[nom][0])
+    if "departement" in requete:
+        params["departements"] = tuple(int(d) for d in requete["departement"][0].split(",") if d)
+    if "variable" in requete:
+        params["variable"] = requete["variable"][0]
+        if params["variable"] not in esquisses.VARIABLES:
+            raise ValueError(params["variable"])
+    if "q" in requete:
+        params["q"] = tuple(float(q) for q in requete["q"][0].split(",") if q)
+        if not all(0 <= q <= 1 for q in params["q"]):
+            raise ValueError(params["q"])
+    if not set(params) <= PARAMETRES[route]:
+        raise ValueError(sorted(set(params) - PARAMETRES[route]))
+    return params
+
+
+# =====================
+# SÉRIALISATION
+# =====================
+def _json(resultat):
+    if isinstance(resultat, dict):
+        lignes = resultat
+    else:
+        lignes = resultat.astype(object).where(resultat.notna(), None).to_dict(orient="records")
+    return json.dumps(lignes, default=_valeur_json, allow_nan=False).encode()
+
+
+def _valeur_json(valeur):
+    if hasattr(valeur, "item"):
+        valeur = valeur.item()
+    return None if isinstance(valeur, float) and math.isnan(valeur) else valeur
+
+
+def _arrow(resultat):
+    if isinstance(resultat, dict):
+        resultat = pd.DataFrame([resultat])
+    table = pa.Table.from_pandas(resultat, preserve_index=False)
+    puits = pa.BufferOutputStream()
+    with pa.ipc.new_stream(puits, table.schema) as flux:
+        flux.write_table(table)
+    return puits.getvalue().to_pybytes()
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def _reponse(route, params, format_, version):
+    resultat = ROUTES[route](_donnees(version), **dict(params))
+    if isinstance(resultat, dict):
+        # NaN (sélection vide) → null en JSON
+        resultat = {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in resultat.items()}
+    return _arrow(resultat) if format_ == "arrow" else _json(resultat)
+
+
+def etag(route, params, format_, version):
+    """ETag calculé sans évaluer la route : requêtes conditionnelles à coût nul."""
+    cle = json.dumps([route, sorted(params), format_, version])
+    return '"' + hashlib.sha1(cle.encode()).hexdigest()[:16] + '"'
+
+
+# =====================
+# SERVEUR
+# =====================
+class _GestionnaireAPI(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = url.path.rstrip("/") or "/"
+        if route == "/":
+            return self._envoyer(200, json.dumps(sorted(ROUTES)).encode(), "application/json")
+        if route not in ROUTES:
+            return self._envoyer(404, b'{"erreur": "route inconnue"}', "application/json")
+
+        requete = parse_qs(url.query)
+        try:
+            params = tuple(sorted(_parametres(route, requete).items()))
+        except ValueError:
+            return self._envoyer(400, b'{"erreur": "parametre invalide"}', "application/json")
+        arrow = requete.get("format", [""])[0] == "arrow" or TYPE_ARROW in self.headers.get("Accept", "")
+        format_ = "arrow" if arrow else "json"
+
+        version = version_donnees()
+        tag = etag(route, params, format_, version)
+        if tag in self.headers.get("If-None-Match", ""):
+            return self._envoyer(304, b"", None, tag)
+        try:
+            corps = _reponse(route, params, format_, version)
+        except Exception:
+            traceback.print_exc()
+            return self._envoyer(500, b'{"erreur": "erreur interne"}', "application/json")
+        self._envoyer(200, corps, TYPE_ARROW if arrow else "application/json", tag)
+
+    def _envoyer(self, code, corps, type_, tag=None):
+        self.send_response(code)
+        if type_:
+            self.send_header("Content-Type", type_)
+        if tag:
+            self.send_header("ETag", tag)
+            self.send_header("Cache-Control", "no-cache")    # revalidation systématique via If-None-Match
+            self.send_header("Vary", "Accept")              # JSON ou Arrow selon l'en-tête Accept
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        if code != 304:
+            self.wfile.write(corps)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def servir(port=PORT):
+    """Sert les agrégats du dashboard sur http://localhost:<port>/<route>."""
+    serveur = ThreadingHTTPServer(("", port), _GestionnaireAPI)
+    print(f"📡 API servie sur http://localhost:{port} : {', '.join(ROUTES)}")
+    serveur.serve_forever()
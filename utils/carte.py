@@ -0,0 +1,95 @@
+import copy
+
+import folium
+import pandas as pd
+from branca.colormap import LinearColormap
+from folium.plugins import HeatMap, MarkerCluster
+from folium.utilities import JsCode
+from streamlit_folium import st_folium
+
+# =====================
+# CARTE DE BASE EN CACHE + COUCHES DYNAMIQUES
+# =====================
+# La carte de base (fond, contours) est construite une fois et
+# mise en cache : ses identifiants Leaflet restent stables, donc le
+# composant n'est pas recréé côté navigateur. Seules les couches de
+# données passent par ``feature_group_to_add`` et sont remplacées à chaud.
+#
+# ``st_folium`` modifie la carte qu'on lui passe (couches et contrôle
+# ajoutés, identifiants réécrits, rendu dans la figure racine) : chaque
+# rendu reçoit une copie de l'arbre des éléments, et la carte en cache,
+# partagée entre sessions, n'est jamais modifiée.
+
+
+def charger_plugins(m):
+    """Embarque dans la carte de base les scripts des plugins utilisés par les couches dynamiques."""
+    HeatMap([], control=False, show=False).add_to(m)
+    MarkerCluster(control=False).add_to(m)
+
+
+def copie_carte(m):
+    """Copie de l'arbre des éléments de ``m`` dans une nouvelle figure.
+
+    Chaque élément est copié superficiellement (données partagées, pas
+    recopiées) avec son propre dictionnaire d'enfants et son propre parent.
+    """
+    def copier(element, parent):
+        clone = copy.copy(element)
+        clone._parent = parent
+        clone._children = type(element._children)(
+            (nom, copier(enfant, clone)) for nom, enfant in element._children.items()
+        )
+        return clone
+
+    copie = copier(m, None)
+    folium.Figure().add_child(copie, name=m.get_name())
+    return copie
+
+
+def afficher_carte(m, couches, **kwargs):
+    """Affiche une copie de la carte de base avec les ``couches`` de données."""
+    return st_folium(
+        copie_carte(m),
+        feature_group_to_add=couches,
+        layer_control=folium.LayerControl(collapsed=False),
+        **kwargs
+    )
+
+
+# =====================
+# CHOROPLÈTHE (style embarqué dans les propriétés)
+# =====================
+# Les couleurs sont calculées d'un bloc côté Python et écrites dans
+# ``properties.style`` : pas de ``style_function`` appelée entité par
+# entité, Leaflet applique le style à la création de chaque entité.
+_STYLE_EMBARQUE = JsCode("""
+function(feature, layer) {
+    layer.setStyle(feature.properties.style);
+    layer.on({
+        mouseover: function(e) { e.target.setStyle({"weight": 3, "color": "#ffffff"}); },
+        mouseout: function(e) { e.target.setStyle(feature.properties.style); }
+    });
+}
+""")
+_STYLE_SANS_DONNEE = {"fillColor": "#555555", "fillOpacity": 0.3, "color": "#888888", "weight": 1}
+
+
+def couche_choroplethe(gdf, colonne, couleurs, conteneur, alias):
+    """Polygones colorés selon ``colonne`` (échelle linéaire min → max)."""
+    valeurs = gdf[colonne]
+    vmin, vmax = valeurs.min(), valeurs.max()
+    palette = LinearColormap(couleurs, vmin=vmin, vmax=vmax if vmax > vmin else vmin + 1)
+    styles = [
+        {"fillColor": palette(v), "fillOpacity": 0.65, "color": "#1a1a2e", "weight": 1}
+        if pd.notna(v) else _STYLE_SANS_DONNEE
+        for v in valeurs
+    ]
+    folium.GeoJson(
+        gdf.assign(style=styles),
+        on_each_feature=_STYLE_EMBARQUE,
+        tooltip=folium.GeoJsonTooltip(
+            fields=["dep", colonne],
+            aliases=["🔢 Département:", alias],
+            style="background-color: rgba(0,0,0,0.8); color: white; border-radius: 10px; padding: 10px;"
+        )
+    ).add_to(conteneur)
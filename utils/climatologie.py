@@ -0,0 +1,117 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# =====================
+# PARAMÈTRES
+# =====================
+# Variables couvertes et agrégation au pas journalier
+VARIABLES = {"T": "mean", "RR1": "sum"}
+QUANTILES = (10, 50, 90)
+DEMI_FENETRE = 15   # lissage sur ±15 jours autour du jour calendaire
+MIN_VALEURS = 10    # nombre minimal de valeurs pour publier une normale
+JOURS = 366
+TAILLE_BLOC = 64    # stations traitées par bloc (borne la mémoire)
+
+
+def jour_calendaire(dates):
+    """Jour de l'année sur un calendrier bissextile (le 29 février vaut 60)."""
+    jour = dates.dt.dayofyear.to_numpy()
+    decalage = (~dates.dt.is_leap_year.to_numpy()) & (jour >= 60)
+    return jour + decalage
+
+
+def series_journalieres(df, variables=VARIABLES):
+    """Agrège les observations au pas journalier par station."""
+    daily = (
+        df.groupby(["NUM_POSTE", df["date"].dt.normalize()])[list(variables)]
+        .agg(variables)
+        .reset_index()
+    )
+    daily["annee"] = daily["date"].dt.year
+    daily["jour"] = jour_calendaire(daily["date"])
+    return daily
+
+
+def _cube(daily, variable, postes, annees):
+    # Tableau dense station × année × jour calendaire (NaN = pas de donnée)
+    cube = np.full((len(postes), len(annees), JOURS), np.nan, dtype=np.float32)
+    s = postes.get_indexer(daily["NUM_POSTE"])
+    a = annees.get_indexer(daily["annee"])
+    cube[s, a, daily["jour"].to_numpy() - 1] = daily[variable].to_numpy()
+    return cube
+
+
+def _normales_bloc(cube, demi_fenetre):
+    # Fenêtre circulaire : fin décembre voisine avec début janvier
+    w = demi_fenetre
+    padded = np.concatenate([cube[..., -w:], cube, cube[..., :w]], axis=2)
+    fenetres = sliding_window_view(padded, 2 * w + 1, axis=2)   # S × A × J × W
+    valeurs = fenetres.transpose(0, 2, 1, 3).reshape(cube.shape[0], JOURS, -1)
+
+    n = np.isfinite(valeurs).sum(axis=2)
+    with warnings.catch_warnings():
+        # Tranches entièrement vides → NaN, masquées ensuite via n
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        moy = np.nanmean(valeurs, axis=2)
+        quant = np.nanpercentile(valeurs, QUANTILES, axis=2)
+    return n, moy, quant
+
+
+def calculer_normales(df, variables=VARIABLES, demi_fenetre=DEMI_FENETRE):
+    """Normales climatologiques par station et jour calendaire, toutes années confondues.
+
+    Retourne une grille dense (NUM_POSTE, jour) triée, avec pour chaque
+    variable la moyenne lissée (``<var>_moy``) et les quantiles ``<var>_q10/q50/q90``.
+    """
+    daily = series_journalieres(df, variables)
+    postes = pd.Index(np.sort(daily["NUM_POSTE"].unique()))
+    annees = pd.Index(np.sort(daily["annee"].unique()))
+
+    normales = pd.DataFrame({
+        "NUM_POSTE": np.repeat(postes.to_numpy(), JOURS),
+        "jour": np.tile(np.arange(1, JOURS + 1, dtype=np.int16), len(postes)),
+    })
+    for variable in variables:
+        cube = _cube(daily, variable, postes, annees)
+        moy = np.empty((len(postes), JOURS), dtype=np.float32)
+        quant = np.empty((len(QUANTILES), len(postes), JOURS), dtype=np.float32)
+        for debut in range(0, len(postes), TAILLE_BLOC):
+            bloc = slice(debut, debut + TAILLE_BLOC)
+            n, m, q = _normales_bloc(cube[bloc], demi_fenetre)
+            trop_peu = n < MIN_VALEURS
+            m[trop_peu] = np.nan
+            q[:, trop_peu] = np.nan
+            moy[bloc], quant[:, bloc] = m, q
+        normales[f"{variable}_moy"] = moy.ravel()
+        for i, p in enumerate(QUANTILES):
+            normales[f"{variable}_q{p}"] = quant[i].ravel()
+    return normales
+
+
+def anomalies(df, normales, variable):
+    """Série journalière d'anomalies par station pour un sous-ensemble quelconque.
+
+    La normale est retrouvée par indexation directe dans la grille
+    (position station × 366 + jour), sans jointure.
+    """
+    daily = series_journalieres(df, {variable: VARIABLES[variable]})
+    postes = pd.Index(normales["NUM_POSTE"].to_numpy()[::JOURS])
+    pos = postes.get_indexer(daily["NUM_POSTE"])
+    idx = np.where(pos >= 0, pos * JOURS + daily["jour"].to_numpy() - 1, 0)
+    connu = pos >= 0
+
+    def lookup(colonne):
+        valeurs = normales[colonne].to_numpy()[idx].astype(float)
+        valeurs[~connu] = np.nan
+        return valeurs
+
+    out = daily[["NUM_POSTE", "date"]].copy()
+    out["valeur"] = daily[variable].to_numpy()
+    out["normale"] = lookup(f"{variable}_moy")
+    out["q10"] = lookup(f"{variable}_q10")
+    out["q90"] = lookup(f"{variable}_q90")
+    out["anomalie"] = out["valeur"] - out["normale"]
+    return out
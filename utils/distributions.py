@@ -0,0 +1,89 @@
+import numpy as np
+
+# =====================
+# RÉSUMÉS DE DISTRIBUTION (boîtes à moustaches)
+# =====================
+# Les quartiles, moustaches et valeurs aberrantes sont calculés côté
+# serveur, par groupe et en une passe vectorisée : le navigateur reçoit
+# quelques nombres par département au lieu de toutes les observations.
+# Conventions de Plotly : moustaches = valeurs extrêmes dans
+# [q1 - 1.5 IQR, q3 + 1.5 IQR], aberrantes = valeurs au-delà.
+COEF_IQR = 1.5
+MAX_ABERRANTS = 50          # par groupe : les plus éloignées de la médiane
+
+
+def resume_boites(df, groupe, colonne, max_aberrants=MAX_ABERRANTS):
+    """Une ligne par groupe : n, q1, mediane, q3, bas, haut (moustaches), moyenne.
+
+    Retourne ``(resume, aberrants)`` ; ``aberrants`` liste au plus
+    ``max_aberrants`` valeurs hors moustaches par groupe (colonnes
+    ``groupe``, ``colonne``).
+    """
+    valeurs = df[[groupe, colonne]].dropna()
+    g = valeurs.groupby(groupe)[colonne]
+    resume = g.quantile([0.25, 0.5, 0.75]).unstack()
+    resume.columns = ["q1", "mediane", "q3"]
+    resume["n"] = g.size()
+    resume["moyenne"] = g.mean()
+
+    # Bornes de chaque observation, puis extrêmes à l'intérieur des bornes
+    iqr = resume["q3"] - resume["q1"]
+    cles = valeurs[groupe]
+    borne_basse = cles.map(resume["q1"] - COEF_IQR * iqr)
+    borne_haute = cles.map(resume["q3"] + COEF_IQR * iqr)
+    dedans = valeurs[colonne].between(borne_basse, borne_haute)
+    interieur = valeurs[dedans].groupby(groupe)[colonne]
+    resume["bas"] = interieur.min()
+    resume["haut"] = interieur.max()
+
+    dehors = valeurs[~dedans]
+    ecart = (dehors[colonne] - dehors[groupe].map(resume["mediane"])).abs()
+    aberrants = (
+        dehors.assign(_ecart=ecart.to_numpy())
+        .sort_values("_ecart", ascending=False, kind="stable")
+        .groupby(groupe)
+        .head(max_aberrants)
+        .drop(columns="_ecart")
+        .reset_index(drop=True)
+    )
+    return resume.reset_index(), aberrants
+
+
+def traces_boites(resume, aberrants, groupe, colonne, couleurs=("#00d2ff",)):
+    """Traces Plotly : une boîte précalculée par groupe et ses aberrantes en points.
+
+    Chaque groupe prend la couleur suivante de ``couleurs`` (en cycle),
+    comme ``color=`` dans plotly.express.
+    """
+    aberrants_groupe = dict(list(aberrants.groupby(groupe)))
+    traces = []
+    for i, ligne in enumerate(resume.itertuples(index=False)):
+        cle = getattr(ligne, groupe)
+        couleur = couleurs[i % len(couleurs)]
+        traces.append({
+            "type": "box",
+            "x": [str(cle)],
+            "q1": np.float32([ligne.q1]),
+            "median": np.float32([ligne.mediane]),
+            "q3": np.float32([ligne.q3]),
+            "lowerfence": np.float32([ligne.bas]),
+            "upperfence": np.float32([ligne.haut]),
+            "mean": np.float32([ligne.moyenne]),
+            "boxpoints": False,
+            "marker": {"color": couleur},
+            "name": str(cle),
+            "legendgroup": str(cle),
+        })
+        points = aberrants_groupe.get(cle)
+        if points is not None:
+            traces.append({
+                "type": "scatter",
+                "mode": "markers",
+                "x": np.full(len(points), str(cle), dtype=object),
+                "y": points[colonne].to_numpy(),
+                "marker": {"color": couleur, "size": 4, "opacity": 0.6},
+                "name": "Valeurs extrêmes",
+                "legendgroup": str(cle),
+                "hoverinfo": "y",
+            })
+    return traces
@@ -0,0 +1,350 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from utils import animation, climatologie, esquisses, evenements, glissant, qualite, stations, stockage, tuiles, zonage
+
+# Les bibliothèques géographiques (geopandas, shapely, scipy) sont importées
+# dans les fonctions qui s'en servent : les pages sans carte ne les chargent pas.
+
+# =====================
+# CHEMINS
+# =====================
+DATA_PATH = "data/clean/meteo_clean.parquet"
+SHP_PATH = "data/SHP_meteo.shp"
+DERIVED_DIR = "data/derived"
+
+NORMALES_PATH = os.path.join(DERIVED_DIR, "normales.parquet")
+EVENEMENTS_PATH = os.path.join(DERIVED_DIR, "evenements.parquet")
+ZONAGE_PATH = os.path.join(DERIVED_DIR, "zonage_stations.parquet")
+AGREGATS_DEP_PATH = os.path.join(DERIVED_DIR, "agregats_departements.parquet")
+ESQUISSES_PATH = os.path.join(DERIVED_DIR, "esquisses_station_annee.npz")
+QUALITE_PATH = os.path.join(DERIVED_DIR, "qualite.parquet")
+GEOMETRIES_PATH = os.path.join(DERIVED_DIR, "communes.parquet")
+DEPARTEMENTS_PATH = os.path.join(DERIVED_DIR, "departements.parquet")
+ATTRIBUTS_SHP = ["insee", "nom", "dep"]     # seuls attributs utilisés (zonage, infobulles, filtres)
+
+
+def lire_donnees(colonnes=None):
+    # Mesures éventuellement quantifiées (fichier écrit par stockage.ecrire)
+    df = stockage.lire(DATA_PATH, colonnes)
+    if "date" in df:
+        df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def colonnes_donnees():
+    """Colonnes du fichier nettoyé, dans l'ordre du fichier (lecture du seul schéma)."""
+    return [c for c in pq.read_schema(DATA_PATH).names if not c.startswith("__index_level_")]
+
+
+def lire_shp():
+    """Communes (insee, nom, dep, geometry) en EPSG:4326, depuis le GeoParquet pré-construit."""
+    import geopandas as gpd
+
+    # Le shapefile peut ne pas être déployé : le GeoParquet suffit alors,
+    # s'il porte tous les attributs attendus
+    if (
+        os.path.exists(GEOMETRIES_PATH)
+        and (not os.path.exists(SHP_PATH) or a_jour(GEOMETRIES_PATH, SHP_PATH))
+        and set(ATTRIBUTS_SHP) <= set(pq.read_schema(GEOMETRIES_PATH).names)
+    ):
+        return gpd.read_parquet(GEOMETRIES_PATH)
+    return construire_geometries()
+
+
+def lire_departements():
+    """Départements (dep, geometry) avec centroïde et emprise pré-calculés."""
+    import geopandas as gpd
+
+    if os.path.exists(GEOMETRIES_PATH) and a_jour(DEPARTEMENTS_PATH, GEOMETRIES_PATH):
+        return gpd.read_parquet(DEPARTEMENTS_PATH)
+    return construire_departements()
+
+
+def a_jour(derive, source=DATA_PATH):
+    """Vrai si le fichier dérivé existe et est plus récent que sa source."""
+    return os.path.exists(derive) and os.path.getmtime(derive) >= os.path.getmtime(source)
+
+
+# =====================
+# TABLES DÉRIVÉES (pré-calculées une fois, stockées sur disque)
+# =====================
+def construire_geometries(df=None):
+    """GeoParquet (WKB) des communes, déjà en EPSG:4326 et réduit à ATTRIBUTS_SHP."""
+    import geopandas as gpd
+
+    gdf = gpd.read_file(SHP_PATH, columns=ATTRIBUTS_SHP)
+    if gdf.crs != "EPSG:4326":
+        gdf = gdf.to_crs(epsg=4326)
+    gdf = gdf[ATTRIBUTS_SHP + ["geometry"]]
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    gdf.to_parquet(GEOMETRIES_PATH, index=False)
+    return gdf
+
+
+def construire_departements(df=None):
+    """GeoParquet des départements : fusion des communes, centroïde (Lambert-93) et emprise."""
+    # Le shapefile est à la maille communale : départements par fusion
+    gdf = lire_shp().dissolve(by="dep", as_index=False)[["dep", "geometry"]]
+    gdf = gdf.merge(zonage.centroides_emprises(gdf, "dep"), on="dep")
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    gdf.to_parquet(DEPARTEMENTS_PATH, index=False)
+    return gdf
+
+
+def construire_qualite(df=None):
+    """Index de complétude et d'anomalies par (station, année, mois), voir utils/qualite.py."""
+    if df is None:
+        df = lire_donnees()
+    index = qualite.controler(df)
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    index.to_parquet(QUALITE_PATH, index=False)
+    return index
+
+
+def construire_normales(df=None):
+    if df is None:
+        df = lire_donnees()
+    normales = climatologie.calculer_normales(df)
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    normales.to_parquet(NORMALES_PATH, index=False)
+    return normales
+
+
+def _ecrire_evenements(index, derniere_date):
+    # La dernière date couverte est gardée dans les métadonnées du fichier
+    table = pa.Table.from_pandas(index, preserve_index=False)
+    meta = {**(table.schema.metadata or {}), b"derniere_date": str(derniere_date).encode()}
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    pq.write_table(table.replace_schema_metadata(meta), EVENEMENTS_PATH)
+
+
+def construire_evenements(df=None):
+    if df is None:
+        df = lire_donnees()
+    index = evenements.detecter(df)
+    _ecrire_evenements(index, df["date"].max())
+    return index
+
+
+def mettre_a_jour_evenements(df=None):
+    """Complète l'index existant avec les données postérieures à sa dernière date."""
+    if df is None:
+        df = lire_donnees()
+    if not os.path.exists(EVENEMENTS_PATH):
+        return construire_evenements(df)
+    table = pq.read_table(EVENEMENTS_PATH)
+    derniere = pd.Timestamp(table.schema.metadata[b"derniere_date"].decode())
+    index = table.to_pandas()
+    if df["date"].max() > derniere:
+        index = evenements.mettre_a_jour(index, df, derniere + pd.Timedelta(days=1))
+    _ecrire_evenements(index, df["date"].max())
+    return index
+
+
+def construire_tuiles(df=None):
+    """Pyramide MVT : communes, départements et stations avec leurs agrégats."""
+    import geopandas as gpd
+
+    if df is None:
+        df = lire_donnees()
+    agregats = stations.agregats(df)
+    points = stations.catalogue(df).merge(agregats, on="NUM_POSTE")
+    gdf_stations = gpd.GeoDataFrame(
+        points[["NUM_POSTE", "NOM_USUEL", "DEPARTEMENT", "ALTI", "T_moy", "RR1_an", "U_moy"]],
+        geometry=gpd.points_from_xy(points["LON"], points["LAT"]),
+        crs="EPSG:4326",
+    )
+    communes = lire_shp()[["nom", "dep", "geometry"]]
+    par_dep = gdf_stations.groupby("DEPARTEMENT")[["T_moy", "RR1_an", "U_moy"]].mean().round(1)
+    departements = lire_departements()[["dep", "geometry"]].join(par_dep, on="dep")
+    couches = {
+        "communes": communes.to_crs(epsg=3857),
+        "departements": departements.to_crs(epsg=3857),
+        "stations": gdf_stations.to_crs(epsg=3857),
+    }
+    return tuiles.generer_tuiles(couches)
+
+
+def construire_zonage(df=None):
+    """Table d'affectation station → commune (code INSEE) et département."""
+    if df is None:
+        df = lire_donnees()
+    communes = lire_shp()
+    couches = {
+        "commune": (communes.assign(commune=communes["insee"]), "commune"),
+        "departement": (communes.assign(departement=communes["dep"]), "departement"),
+    }
+    table = zonage.table_affectation(stations.catalogue(df), couches)
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    table.to_parquet(ZONAGE_PATH, index=False)
+    return table
+
+
+def lire_zonage(df=None):
+    # Source géométrique : le GeoParquet des communes (le shapefile peut être absent)
+    if a_jour(ZONAGE_PATH) and os.path.exists(GEOMETRIES_PATH) and a_jour(ZONAGE_PATH, GEOMETRIES_PATH):
+        return pd.read_parquet(ZONAGE_PATH)
+    return construire_zonage(df)
+
+
+def construire_agregats_departements(df=None):
+    """Agrégats par département (affectation géométrique), par année et par mois."""
+    if df is None:
+        df = lire_donnees()
+    affectation = lire_zonage(df)
+    table = zonage.agregats_par_zone(df, affectation, "departement")
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    table.to_parquet(AGREGATS_DEP_PATH, index=False)
+    return table
+
+
+def construire_esquisses(df=None):
+    """Esquisses de quantiles par (station, année), voir utils/esquisses.py."""
+    if df is None:
+        df = lire_donnees()
+    table = esquisses.construire(df)
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    np.savez_compressed(ESQUISSES_PATH, **table)
+    return table
+
+
+def lire_esquisses(df=None):
+    if a_jour(ESQUISSES_PATH):
+        with np.load(ESQUISSES_PATH) as fichier:
+            return dict(fichier)
+    return construire_esquisses(df)
+
+
+# =====================
+# CHARGEMENT (cache Streamlit)
+# =====================
+# Les observations sont lues et mises en cache colonne par colonne : chaque
+# page déclare les colonnes qu'elle affiche (``COLONNES``, en tête de page)
+# et ne paie que celles-là ; une colonne manquante est chargée à la demande
+# (``completer``), sans relire les autres. Toutes les colonnes partagent
+# l'index des lignes du fichier.
+@st.cache_data
+def load_colonne(nom):
+    return lire_donnees([nom])[nom]
+
+
+def load_data(colonnes=None):
+    """Observations limitées à ``colonnes`` (toutes par défaut), assemblées depuis le cache par colonne."""
+    return pd.DataFrame({c: load_colonne(c) for c in colonnes or colonnes_donnees()})
+
+
+def completer(df, colonnes=None):
+    """``df`` (lignes du fichier) avec les ``colonnes`` manquantes (toutes par défaut), chargées à la demande."""
+    colonnes = list(colonnes or colonnes_donnees())
+    manquantes = {c: load_colonne(c).loc[df.index] for c in colonnes if c not in df}
+    return df.assign(**manquantes)[colonnes + [c for c in df.columns if c not in colonnes]]
+
+
+@st.cache_data
+def load_shp():
+    return lire_shp()
+
+
+@st.cache_data
+def load_departements():
+    return lire_departements()[["dep", "geometry"]]
+
+
+@st.cache_data
+def load_emprises_departements():
+    """{dep: {"centre": (lat, lon), "bornes": ((sud, ouest), (nord, est))}} : centrage de la carte."""
+    table = lire_departements()
+    return {
+        int(ligne.dep): {
+            "centre": (ligne.centre_lat, ligne.centre_lon),
+            "bornes": ((ligne.sud, ligne.ouest), (ligne.nord, ligne.est)),
+        }
+        for ligne in table.itertuples()
+    }
+
+
+@st.cache_data
+def load_shp_simplifie(tolerance):
+    # Une version par niveau de détail (voir index_spatial.TOLERANCES)
+    gdf = load_shp()
+    if tolerance > 0:
+        gdf = gdf.assign(geometry=gdf.geometry.simplify(tolerance, preserve_topology=True))
+    return gdf
+
+
+@st.cache_data
+def load_qualite():
+    if not a_jour(QUALITE_PATH):
+        return construire_qualite()
+    return pd.read_parquet(QUALITE_PATH)
+
+
+@st.cache_data
+def load_normales():
+    if not a_jour(NORMALES_PATH):
+        return construire_normales()
+    return pd.read_parquet(NORMALES_PATH)
+
+
+@st.cache_data
+def load_evenements():
+    if not a_jour(EVENEMENTS_PATH):
+        return mettre_a_jour_evenements()
+    return pd.read_parquet(EVENEMENTS_PATH)
+
+
+@st.cache_data
+def load_zonage():
+    return lire_zonage()
+
+
+@st.cache_data
+def load_agregats_departements():
+    if not (a_jour(AGREGATS_DEP_PATH) and os.path.exists(GEOMETRIES_PATH) and a_jour(AGREGATS_DEP_PATH, GEOMETRIES_PATH)):
+        return construire_agregats_departements()
+    return pd.read_parquet(AGREGATS_DEP_PATH)
+
+
+@st.cache_data
+def load_glissant(fenetre):
+    # Une entrée de cache par taille de fenêtre
+    colonnes = ["NUM_POSTE", "DEPARTEMENT", "date", *glissant.VARIABLES]
+    return glissant.statistiques_glissantes(load_data(colonnes), fenetre)
+
+
+@st.cache_data
+def load_frames(annee, variable, pas):
+    # Une entrée par (année, variable, pas) : toutes les frames de l'année d'un coup
+    df = load_data(["NUM_POSTE", "LAT", "LON", "date", "annee", variable])
+    return animation.frames(df[df["annee"] == annee], variable, pas)
+
+
+@st.cache_resource
+def load_index_stations(colonnes=None):
+    # Partagé (sans copie) entre sessions : tri + bornes par station
+    return stations.indexer(load_data(colonnes))
+
+
+@st.cache_data
+def load_catalogue_stations():
+    return stations.catalogue(load_data(stations.COLONNES_CATALOGUE))
+
+
+@st.cache_resource
+def load_esquisses():
+    # Tableaux en lecture seule, partagés entre sessions
+    return lire_esquisses()
+
+
+@st.cache_resource
+def load_index_spatial():
+    # Construit une seule fois par processus (STRtree + KD-tree)
+    from utils.index_spatial import IndexSpatial
+
+    return IndexSpatial(load_shp(), load_catalogue_stations())
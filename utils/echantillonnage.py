@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# =====================
+# PARAMÈTRES
+# =====================
+LARGEUR_GRAPHIQUE = 1200    # largeur typique d'un graphique pleine page (px)
+
+
+def _en_nombres(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def lttb(x, y, n):
+    """Indices retenus par Largest-Triangle-Three-Buckets (Steinarsson, 2013).
+
+    Conserve le premier et le dernier point ; dans chaque seau, garde le
+    point qui forme le plus grand triangle avec le point retenu précédent
+    et la moyenne du seau suivant.
+    """
+    taille = len(x)
+    if n >= taille or n < 3:
+        return np.arange(taille)
+    x, y = _en_nombres(x), np.asarray(y, dtype=float)
+
+    bornes = np.linspace(1, taille - 1, n - 1).astype(int)
+    indices = np.empty(n, dtype=np.int64)
+    indices[0], indices[-1] = 0, taille - 1
+    precedent = 0
+    for i in range(n - 2):
+        debut, fin = bornes[i], bornes[i + 1]
+        suivant_fin = bornes[i + 2] if i + 2 < len(bornes) else taille
+        mx = x[fin:suivant_fin].mean() if suivant_fin > fin else x[-1]
+        my = y[fin:suivant_fin].mean() if suivant_fin > fin else y[-1]
+        aires = np.abs(
+            (x[precedent] - mx) * (y[debut:fin] - y[precedent])
+            - (x[precedent] - x[debut:fin]) * (my - y[precedent])
+        )
+        precedent = debut + int(np.argmax(aires))
+        indices[i + 1] = precedent
+    return indices
+
+
+def minmax(x, y, n):
+    """Indices des minimum et maximum de chaque seau (2 points par pixel de largeur)."""
+    taille = len(x)
+    seaux = max(n // 2, 1)
+    if 2 * seaux >= taille:
+        return np.arange(taille)
+    y = np.asarray(y, dtype=float)
+    seau = np.arange(taille) * seaux // taille
+    ordre = np.lexsort((y, seau))           # tri par seau puis par valeur
+    debuts = np.searchsorted(seau[ordre], np.arange(seaux))
+    fins = np.r_[debuts[1:], taille] - 1
+    return np.unique(np.r_[ordre[debuts], ordre[fins]])
+
+
+METHODES = {"lttb": lttb, "minmax": minmax}
+
+
+def reduire(df, x, y, groupe=None, n=LARGEUR_GRAPHIQUE, methode="lttb"):
+    """Sous-échantillonne chaque série (une par groupe) à ``n`` points au plus.
+
+    Les NaN de ``y`` sont écartés avant réduction ; le résultat conserve
+    toutes les colonnes des lignes retenues.
+    """
+    df = df.dropna(subset=[y]).sort_values(([groupe] if groupe else []) + [x])
+    if len(df) <= n:
+        return df
+    fonction = METHODES[methode]
+    morceaux = []
+    for _, serie in (df.groupby(groupe, sort=False) if groupe else [(None, df)]):
+        morceaux.append(serie.iloc[fonction(serie[x].to_numpy(), serie[y].to_numpy(), n)])
+    return pd.concat(morceaux)
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+# =====================
+# ESQUISSES DE QUANTILES PAR CELLULE (station, année)
+# =====================
+# Chaque cellule garde au plus K valeurs pondérées par variable :
+# - cellule de n <= K valeurs : toutes les valeurs, poids 1 (exacte) ;
+# - sinon : K représentants, au milieu de K tranches de rangs de taille
+#   n / K, chacun de poids n / K.
+# Les esquisses se fusionnent par simple concaténation : un quantile sur
+# n'importe quelle sélection de cellules se lit sur quelques centaines de
+# points pondérés au lieu des observations.
+#
+# Maille station × année : une année de données journalières (jusqu'à 366
+# valeurs) tient en K = 32 points, soit ~10× moins que les colonnes
+# d'origine. À la maille mensuelle (n <= 31 < K), les esquisses ne
+# seraient que des copies : un filtre sur le mois se calcule directement
+# sur les observations (voir utils/api.py).
+#
+# Précision : un représentant est à moins de n / (2K) + 1 rangs de la
+# position que lui donne son poids cumulé. Une fusion en une passe (pas de
+# recompression) cumule ces écarts : sur N observations, le quantile
+# rendu est à moins de N / (2K) + C rangs du vrai (C = nombre de cellules
+# compressées), soit une erreur relative de rang <= 1 / (2K) + C / N.
+# Vérification : tests/test_esquisses.py
+K = 32
+VARIABLES = ["T", "RR1", "U", "FF"]
+CLES = ["NUM_POSTE", "DEPARTEMENT", "annee"]
+
+
+def resumer(cellule, x, n_cellules, k=K):
+    """Esquisses de ``x`` par cellule : (valeurs, poids), tableaux ``n_cellules × k``."""
+    ok = np.isfinite(x)
+    cellule, x = cellule[ok], x[ok]
+    ordre = np.lexsort((x, cellule))
+    cellule, x = cellule[ordre], x[ordre]
+
+    n = np.bincount(cellule, minlength=n_cellules)
+    debut = np.concatenate([[0], np.cumsum(n)[:-1]])
+    valeurs = np.full((n_cellules, k), np.nan, dtype=np.float32)
+    poids = np.zeros((n_cellules, k), dtype=np.float32)
+
+    # Cellules exactes : la valeur de rang r va dans la case r
+    petites = n[cellule] <= k
+    rang = np.arange(len(x)) - debut[cellule]
+    valeurs[cellule[petites], rang[petites]] = x[petites]
+    poids[cellule[petites], rang[petites]] = 1
+
+    # Cellules compressées : représentant au milieu de chaque tranche
+    grandes = np.flatnonzero(n > k)
+    tranche = np.arange(k)
+    positions = debut[grandes, None] + ((2 * tranche + 1) * n[grandes, None]) // (2 * k)
+    valeurs[grandes] = x[positions]
+    poids[grandes] = (n[grandes] / k)[:, None]
+    return valeurs, poids
+
+
+def construire(df, variables=VARIABLES, k=K):
+    """Esquisses de ``df`` : clés des cellules (``CLES``) et ``<var>_valeurs`` / ``<var>_poids``."""
+    cellules = df[CLES].drop_duplicates().sort_values(CLES).reset_index(drop=True)
+    cellule = pd.MultiIndex.from_frame(cellules).get_indexer(pd.MultiIndex.from_frame(df[CLES]))
+    esquisses = {cle: cellules[cle].to_numpy() for cle in CLES}
+    for variable in variables:
+        valeurs, poids = resumer(cellule, df[variable].to_numpy(np.float64), len(cellules), k)
+        esquisses[f"{variable}_valeurs"], esquisses[f"{variable}_poids"] = valeurs, poids
+    return esquisses
+
+
+# =====================
+# REQUÊTES
+# =====================
+def selection(esquisses, annee=None, departements=None, postes=None):
+    """Masque des cellules correspondant aux filtres (None : pas de filtre)."""
+    masque = np.ones(len(esquisses["annee"]), dtype=bool)
+    if annee is not None:
+        masque &= esquisses["annee"] == annee
+    if departements:
+        masque &= np.isin(esquisses["DEPARTEMENT"], departements)
+    if postes:
+        masque &= np.isin(esquisses["NUM_POSTE"], postes)
+    return masque
+
+
+def quantiles(esquisses, variable, qs, masque=None):
+    """Quantiles ``qs`` de ``variable`` sur les cellules du masque (fusion des esquisses).
+
+    Quantile « inverse de la fonction de répartition » : plus petite valeur
+    dont le poids cumulé atteint q. NaN si la sélection est vide.
+    """
+    valeurs, poids = esquisses[f"{variable}_valeurs"], esquisses[f"{variable}_poids"]
+    if masque is not None:
+        valeurs, poids = valeurs[masque], poids[masque]
+    valeurs, poids = valeurs.ravel(), poids.ravel()
+    garde = poids > 0
+    qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+    if not garde.any():
+        return np.full(len(qs), np.nan)
+
+    valeurs, poids = valeurs[garde], poids[garde].astype(np.float64)
+    ordre = np.argsort(valeurs, kind="stable")
+    valeurs, cumul = valeurs[ordre], np.cumsum(poids[ordre])
+    rangs = np.searchsorted(cumul, qs * cumul[-1], side="left")
+    return valeurs[np.minimum(rangs, len(valeurs) - 1)].astype(np.float64)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from utils.climatologie import series_journalieres
+
+# =====================
+# CRITÈRES DE DÉTECTION
+# =====================
+# Pour chaque type : variable de pic, seuil(s) journaliers, durée minimale (jours)
+CRITERES = {
+    "canicule": {
+        "label": "🔥 Canicule",
+        "variable": "TX",
+        "seuil": 33.0,
+        "condition": lambda d: (d["TX"] >= 33.0) & (d["TN"] >= 20.0),
+        "duree_min": 3,
+    },
+    "pluie": {
+        "label": "🌧️ Pluie intense",
+        "variable": "RR1",
+        "seuil": 50.0,
+        "condition": lambda d: d["RR1"] >= 50.0,
+        "duree_min": 1,
+    },
+    "tempete": {
+        "label": "🌬️ Tempête",
+        "variable": "FXI",
+        "seuil": 28.0,   # rafale ≥ 100 km/h
+        "condition": lambda d: d["FXI"] >= 28.0,
+        "duree_min": 1,
+    },
+}
+
+AGREGATS = {"TX": "max", "TN": "min", "RR1": "sum", "FXI": "max"}
+COLONNES_INDEX = ["type", "NUM_POSTE", "NOM_USUEL", "DEPARTEMENT", "LAT", "LON",
+                  "debut", "fin", "duree", "pic", "intensite"]
+
+
+def detecter(df):
+    """Détecte les épisodes extrêmes par station (détection de séquences vectorisée).
+
+    Retourne l'index des événements : station, début, fin, durée, pic et
+    intensité (somme des dépassements du seuil sur l'épisode).
+    """
+    daily = series_journalieres(df, AGREGATS).sort_values(["NUM_POSTE", "date"])
+    poste = daily["NUM_POSTE"].to_numpy()
+    date = daily["date"].to_numpy()
+    # Rupture de séquence : changement de station ou jour manquant
+    rupture = np.r_[True, (poste[1:] != poste[:-1]) | (np.diff(date) != np.timedelta64(1, "D"))]
+
+    evenements = []
+    for type_, critere in CRITERES.items():
+        masque = critere["condition"](daily).to_numpy()
+        debut = masque & (rupture | ~np.r_[False, masque[:-1]])
+        sel = daily.loc[masque, ["NUM_POSTE", "date", critere["variable"]]]
+        sel = sel.assign(
+            sequence=np.cumsum(debut)[masque],
+            exces=sel[critere["variable"]] - critere["seuil"],
+        )
+        ev = sel.groupby("sequence").agg(
+            NUM_POSTE=("NUM_POSTE", "first"),
+            debut=("date", "min"),
+            fin=("date", "max"),
+            duree=("date", "size"),
+            pic=(critere["variable"], "max"),
+            intensite=("exces", "sum"),
+        )
+        evenements.append(ev[ev["duree"] >= critere["duree_min"]].assign(type=type_))
+
+    index = pd.concat(evenements, ignore_index=True)
+    stations = df[["NUM_POSTE", "NOM_USUEL", "DEPARTEMENT", "LAT", "LON"]].drop_duplicates("NUM_POSTE")
+    index = index.merge(stations, on="NUM_POSTE", how="left")
+    return index[COLONNES_INDEX].sort_values(["debut", "NUM_POSTE"], ignore_index=True)
+
+
+def mettre_a_jour(index, df, depuis):
+    """Mise à jour incrémentale de l'index avec les données arrivées à partir de ``depuis``.
+
+    Seuls les événements susceptibles de se prolonger après ``depuis`` sont
+    recalculés, à partir de leur date de début ; le reste de l'index est
+    conservé tel quel. La reprise remonte d'au moins la plus longue durée
+    minimale pour retrouver les séquences encore trop courtes pour être indexées.
+    """
+    duree_max = max(c["duree_min"] for c in CRITERES.values())
+    reprise = pd.Timestamp(depuis) - pd.Timedelta(days=duree_max - 1)
+    while True:
+        ouverts = index["fin"] >= reprise - pd.Timedelta(days=1)
+        debut = index.loc[ouverts, "debut"].min()
+        if not ouverts.any() or debut >= reprise:
+            break
+        reprise = debut
+    nouveaux = detecter(df[df["date"] >= reprise])
+    return pd.concat([index[~ouverts], nouveaux], ignore_index=True).sort_values(
+        ["debut", "NUM_POSTE"], ignore_index=True
+    )
+
+
+def filtrer(index, annee, mois="Tous", departement="Tous"):
+    """Événements qui recouvrent la période (et le département) sélectionnés."""
+    debut = pd.Timestamp(annee, 1 if mois == "Tous" else mois, 1)
+    fin = debut + (pd.DateOffset(years=1) if mois == "Tous" else pd.DateOffset(months=1))
+    sel = index[(index["debut"] < fin) & (index["fin"] >= debut)]
+    if departement != "Tous":
+        sel = sel[sel["DEPARTEMENT"] == departement]
+    return sel
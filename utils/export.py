@@ -0,0 +1,113 @@
+import io
+import json
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import streamlit as st
+
+from utils.donnees import completer
+
+# =====================
+# PARAMÈTRES
+# =====================
+TAILLE_BLOC = 50_000            # lignes par lot Arrow écrit
+
+
+# =====================
+# ÉCRITURE PAR LOTS
+# =====================
+# La sélection est convertie en Arrow et écrite par tranches de
+# ``TAILLE_BLOC`` lignes : ni table Arrow de toute la sélection, ni
+# DataFrame complété de toutes les colonnes. Seul le fichier produit est
+# tenu en entier en mémoire : Streamlit attend ses octets pour le servir.
+def _lots(df, complet):
+    """Lots Arrow de ``df`` par tranches de lignes, tous au schéma du premier."""
+    schema = None
+    for debut in range(0, max(len(df), 1), TAILLE_BLOC):
+        tranche = df.iloc[debut:debut + TAILLE_BLOC]
+        if complet:
+            tranche = completer(tranche)
+        table = pa.Table.from_pandas(tranche, schema=schema, preserve_index=False)
+        schema = table.schema
+        # Sélection vide : un lot vide, pour que l'écrivain connaisse le schéma
+        yield from table.to_batches() or [pa.RecordBatch.from_pylist([], schema=schema)]
+
+
+def _csv(lots, flux):
+    premier = next(lots)
+    with pacsv.CSVWriter(flux, premier.schema) as ecrivain:
+        ecrivain.write_batch(premier)
+        for lot in lots:
+            ecrivain.write_batch(lot)
+
+
+def _parquet(lots, flux):
+    premier = next(lots)
+    with pq.ParquetWriter(flux, premier.schema, compression="zstd") as ecrivain:
+        ecrivain.write_batch(premier)
+        for lot in lots:
+            ecrivain.write_batch(lot)
+
+
+def _geojson(lots, flux):
+    # Une entité Point par ligne (colonnes LAT / LON)
+    flux.write(b'{"type": "FeatureCollection", "features": [')
+    n = 0
+    for lot in lots:
+        if not lot.num_rows:
+            continue
+        proprietes = [c for c in lot.schema.names if c not in ("LAT", "LON")]
+        entites = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": props,
+            }
+            for lon, lat, props in zip(
+                lot.column("LON").to_pylist(),
+                lot.column("LAT").to_pylist(),
+                lot.select(proprietes).to_pylist(),
+            )
+        ]
+        # Un seul json.dumps par lot ; on retire les crochets de la liste
+        flux.write((b"," if n else b"") + json.dumps(entites, default=str)[1:-1].encode())
+        n += 1
+    flux.write(b"]}")
+
+
+FORMATS = {
+    "csv": {"label": "📄 CSV", "mime": "text/csv", "ecrire": _csv},
+    "parquet": {"label": "📦 Parquet", "mime": "application/vnd.apache.parquet", "ecrire": _parquet},
+    "geojson": {"label": "🗺️ GeoJSON", "mime": "application/geo+json", "ecrire": _geojson},
+}
+
+
+def exporteur(df, format_, complet=False):
+    """Fonction sans argument qui écrit ``df`` au format demandé et renvoie les octets.
+
+    Passée à ``st.download_button`` (``data`` appelable : Streamlit >= 1.52),
+    elle n'est exécutée qu'au clic, hors du rerun de la page. ``complet`` : observations complétées, au clic,
+    des colonnes que la page n'a pas chargées.
+    """
+    def ecrire():
+        tampon = io.BytesIO()
+        FORMATS[format_]["ecrire"](_lots(df, complet), tampon)
+        return tampon.getvalue()
+
+    return ecrire
+
+
+def boutons_export(df, nom, cle, complet=False):
+    """Boutons de téléchargement de ``df`` (GeoJSON si la table a LAT / LON)."""
+    formats = [f for f in FORMATS if f != "geojson" or {"LAT", "LON"} <= set(df.columns)]
+    for colonne, format_ in zip(st.columns(len(formats)), formats):
+        with colonne:
+            st.download_button(
+                FORMATS[format_]["label"],
+                data=exporteur(df, format_, complet),
+                file_name=f"{nom}.{format_}",
+                mime=FORMATS[format_]["mime"],
+                key=f"export_{cle}_{format_}",
+                disabled=df.empty,
+            )
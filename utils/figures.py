@@ -0,0 +1,139 @@
+from functools import lru_cache
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# =====================
+# FABRIQUE DE FIGURES PLOTLY
+# =====================
+# Le thème du dashboard (template sombre, fonds transparents, police,
+# grilles) est construit une fois par type de graphique et mis en cache.
+# Les figures sont ensuite créées avec ``go.Figure(..., _validate=False)`` :
+# seules les traces (les données) changent d'un rerun à l'autre, et les
+# validateurs Plotly ne sont plus parcourus à chaque graphique.
+#
+# Les layouts en cache sont partagés : ne pas modifier une figure après
+# sa création (pas d'``update_layout``), passer les surcharges à ``figure``.
+GRILLE = "rgba(255,255,255,0.1)"
+TRANSPARENT = "rgba(0,0,0,0)"
+POLICE = {"family": "Poppins", "color": "#e8e8e8"}
+LEGENDE = {"bgcolor": "rgba(0,0,0,0.3)", "bordercolor": GRILLE}
+PALETTE = list(pio.templates["plotly_dark"].layout.colorway)     # couleurs des groupes, dans l'ordre
+
+
+@lru_cache(maxsize=None)
+def layout_base(type_="cartesien"):
+    """Layout commun d'un type de graphique : ``cartesien``, ``boite`` ou ``polaire``."""
+    layout = {
+        "template": pio.templates["plotly_dark"].to_plotly_json(),
+        "paper_bgcolor": TRANSPARENT,
+        "plot_bgcolor": TRANSPARENT,
+        "font": POLICE,
+        "legend": LEGENDE,
+    }
+    if type_ == "cartesien":
+        layout["xaxis"] = {"gridcolor": GRILLE}
+        layout["yaxis"] = {"gridcolor": GRILLE}
+    elif type_ == "boite":
+        layout["xaxis"] = {}
+        layout["yaxis"] = {}
+    elif type_ == "polaire":
+        axe = {"gridcolor": GRILLE, "linecolor": GRILLE}
+        layout["polar"] = {"bgcolor": TRANSPARENT, "radialaxis": axe, "angularaxis": axe}
+    return layout
+
+
+def layout(type_="cartesien", titre=None, x="", y="", **surcharges):
+    """Layout en cache + titres ; les surcharges de type dict sont fusionnées sur un niveau."""
+    base = layout_base(type_)
+    out = dict(base)
+    if titre:
+        out["title"] = {"text": titre}
+    if "xaxis" in base:
+        out["xaxis"] = {**base["xaxis"], "title": {"text": x}}
+        out["yaxis"] = {**base["yaxis"], "title": {"text": y}}
+    for cle, valeur in surcharges.items():
+        if isinstance(valeur, dict) and isinstance(out.get(cle), dict):
+            valeur = {**out[cle], **valeur}
+        out[cle] = valeur
+    return out
+
+
+def figure(traces, **kwargs):
+    """Figure sans validation : ``traces`` est une liste de dicts (``type`` + données)."""
+    dates = False
+    for trace in traces:
+        for cle in ("x", "y", "r"):
+            if cle in trace:
+                trace[cle], est_date = compacter(trace[cle])
+                dates |= est_date and cle == "x"
+    out = layout(**kwargs)
+    if dates:
+        out["xaxis"] = {**out["xaxis"], "type": "date"}
+    return go.Figure(data=traces, layout=out, _validate=False)
+
+
+# =====================
+# DONNÉES BINAIRES
+# =====================
+# Plotly (>= 6) sérialise les tableaux numpy numériques en typed arrays base64
+# (``{"dtype": "f4", "bdata": ...}``), lus tels quels par Plotly.js. On
+# réduit les flottants en float32 quand la précision le permet, et les
+# dates (sinon envoyées en texte ISO) en millisecondes depuis l'époque,
+# sur un axe de type date.
+FLOAT32_MAX = 1e6           # au-delà, float32 perd le dixième d'unité : float64 conservé
+
+
+def compacter(valeurs):
+    """(tableau compact, vrai si les valeurs étaient des dates)."""
+    v = np.asarray(valeurs)
+    if np.issubdtype(v.dtype, np.datetime64):
+        return v.astype("datetime64[ms]").astype(np.int64).astype(np.float64), True
+    if v.dtype == np.float64 and np.abs(v[np.isfinite(v)]).max(initial=0) < FLOAT32_MAX:
+        return v.astype(np.float32), False
+    return v, False
+
+
+# =====================
+# TRACES (dicts Plotly, données en tableaux numpy)
+# =====================
+def _valeurs(v):
+    return np.asarray(v)
+
+
+def ligne(x, y, couleur=None, nom=None, marqueurs=False, largeur=3, taille=10, **autres):
+    trace = {"type": "scatter", "mode": "lines+markers" if marqueurs else "lines",
+             "x": _valeurs(x), "y": _valeurs(y), "line": {"width": largeur}, **autres}
+    if marqueurs:
+        trace["marker"] = {"size": taille}
+    if couleur:
+        trace["line"]["color"] = couleur
+        if marqueurs:
+            trace["marker"]["color"] = couleur
+    if nom is not None:
+        trace["name"] = str(nom)
+    return trace
+
+
+def aire(x, y, remplissage):
+    """Aire sous une courbe (trace sans ligne ni légende)."""
+    return {"type": "scatter", "mode": "lines", "x": _valeurs(x), "y": _valeurs(y), "fill": "tozeroy",
+            "fillcolor": remplissage, "line": {"color": TRANSPARENT}, "showlegend": False}
+
+
+def barres(x, y, couleur=None, nom=None, echelle=None, **autres):
+    """Barres de couleur unie, ou colorées selon ``y`` sur l'``echelle`` donnée."""
+    trace = {"type": "bar", "x": _valeurs(x), "y": _valeurs(y), **autres}
+    if echelle:
+        trace["marker"] = {"color": _valeurs(y), "colorscale": echelle, "showscale": False}
+    elif couleur is not None:
+        trace["marker"] = {"color": couleur}
+    if nom is not None:
+        trace["name"] = str(nom)
+    return trace
+
+
+def par_groupe(df, groupe, fabrique, x, y, **kwargs):
+    """Une trace par valeur de ``groupe`` (équivalent de ``color=`` dans plotly.express)."""
+    return [fabrique(d[x], d[y], nom=nom, **kwargs) for nom, d in df.groupby(groupe, sort=True)]
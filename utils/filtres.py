@@ -0,0 +1,93 @@
+import streamlit as st
+
+from utils.donnees import load_qualite
+from utils.qualite import SEUIL_COMPLETUDE, exclure_incompletes
+
+# =====================
+# FILTRES PARTAGÉS ENTRE PAGES
+# =====================
+# L'état des filtres (année, mois, département, stations complètes) vit dans st.session_state :
+# chaque widget a une clé stable, réécrite depuis cet état avant sa
+# création, et un callback ``on_change`` y recopie la saisie.
+# Les tranches et agrégats dérivés sont mémoïsés dans la session, par nom
+# et par valeur des filtres : revenir sur une page avec la même sélection
+# réutilise les objets déjà calculés.
+#
+# Les objets mémoïsés sont partagés (pas de copie) : ne pas les modifier
+# en place.
+CLE_FILTRES = "filtres"
+CLE_CACHE = "filtres_cache"
+TAILLE_CACHE = 32
+
+
+def etat_filtres(df):
+    """Filtres courants de la session (valeurs par défaut : dernière année, tous mois, toute la zone)."""
+    if CLE_FILTRES not in st.session_state:
+        st.session_state[CLE_FILTRES] = {
+            "annee": int(df["annee"].max()),
+            "mois": "Tous",
+            "departement": "Tous",
+            "completes": False,
+        }
+    return st.session_state[CLE_FILTRES]
+
+
+def memoise(nom, calcul, *cle):
+    """Résultat de ``calcul()`` mémoïsé dans la session sous ``(nom, *cle)``."""
+    cache = st.session_state.setdefault(CLE_CACHE, {})
+    cle = (nom, *cle)
+    if cle not in cache:
+        if len(cache) >= TAILLE_CACHE:
+            cache.pop(next(iter(cache)))        # plus ancienne entrée
+        cache[cle] = calcul()
+    return cache[cle]
+
+
+def widget_filtre(widget, filtres, nom, label, **kwargs):
+    """``widget(label, ...)`` lié au filtre partagé ``nom``, sous la clé ``filtre_<nom>``.
+
+    Pas de ``value`` / ``index`` : une valeur par défaut qui change à chaque
+    rerun changerait l'identifiant du widget et ferait perdre la saisie
+    suivante. La clé est réécrite depuis l'état partagé avant chaque rendu
+    (valeur choisie sur une autre page), et ``on_change`` y recopie la saisie.
+    """
+    cle = f"filtre_{nom}"
+
+    def synchroniser():
+        filtres[nom] = st.session_state[cle]
+
+    st.session_state[cle] = filtres[nom]
+    return widget(label, key=cle, on_change=synchroniser, **kwargs)
+
+
+def case_completes(filtres):
+    """Case « stations complètes uniquement » de la sidebar, liée aux filtres partagés."""
+    return widget_filtre(
+        st.toggle, filtres, "completes", "✅ Stations complètes uniquement",
+        help=f"Exclut les stations ayant moins de {SEUIL_COMPLETUDE:.0%} de jours observés "
+             "sur un mois (sur l'un des mois de l'année en vue annuelle)",
+    )
+
+
+def tranche(df, annee, mois="Tous", departement="Tous", completes=False):
+    """Observations filtrées par année, mois et département (mémoïsées).
+
+    ``completes`` : seulement les stations complètes sur la période, d'après
+    l'index de qualité calculé à l'ingestion (voir utils/qualite.py).
+    Les lignes retenues sont partagées entre pages ; le DataFrame l'est
+    entre pages chargeant les mêmes colonnes.
+    """
+    def lignes():
+        out = df[df["annee"] == annee]
+        if mois != "Tous":
+            out = out[out["mois"] == mois]
+        if departement != "Tous":
+            out = out[out["DEPARTEMENT"] == departement]
+        if completes:
+            cles = ["NUM_POSTE", "annee"] if mois == "Tous" else ["NUM_POSTE", "annee", "mois"]
+            out = exclure_incompletes(out, load_qualite(), cles)
+        return out.index
+
+    cle = (annee, mois, departement, completes)
+    index = memoise("tranche", lignes, *cle)
+    return memoise("tranche_colonnes", lambda: df.loc[index], *cle, tuple(df.columns))
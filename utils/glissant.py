@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from utils.climatologie import series_journalieres
+
+# =====================
+# PARAMÈTRES
+# =====================
+VARIABLES = {"T": "mean", "RR1": "sum", "U": "mean"}
+CUMULS = ("RR1",)           # variables dont on publie aussi la somme glissante
+FENETRES = (7, 30, 365)
+PART_MIN = 0.8              # part minimale de jours renseignés dans la fenêtre
+
+
+def grille_journaliere(df, variables=VARIABLES):
+    """Séries journalières alignées sur une grille dense station × jour."""
+    daily = series_journalieres(df, variables)
+    postes = pd.Index(np.sort(daily["NUM_POSTE"].unique()))
+    jours = pd.date_range(daily["date"].min(), daily["date"].max(), freq="D")
+    s = postes.get_indexer(daily["NUM_POSTE"])
+    j = jours.get_indexer(daily["date"])
+    grilles = {}
+    for variable in variables:
+        grille = np.full((len(postes), len(jours)), np.nan)
+        grille[s, j] = daily[variable].to_numpy()
+        grilles[variable] = grille
+    return postes, jours, grilles
+
+
+def moyenne_glissante(grille, fenetre, part_min=PART_MIN):
+    """Moyenne glissante (fenêtre finissant au jour courant) par sommes cumulées.
+
+    Toutes les stations sont traitées d'un bloc : deux ``cumsum`` le long
+    de l'axe temporel puis une différence décalée de ``fenetre`` jours.
+    """
+    present = np.isfinite(grille)
+    zeros = np.zeros((grille.shape[0], 1))
+    cs = np.concatenate([zeros, np.cumsum(np.where(present, grille, 0.0), axis=1)], axis=1)
+    cn = np.concatenate([zeros, np.cumsum(present, axis=1)], axis=1)
+
+    somme = np.full(grille.shape, np.nan)
+    n = np.zeros(grille.shape)
+    somme[:, fenetre - 1:] = cs[:, fenetre:] - cs[:, :-fenetre]
+    n[:, fenetre - 1:] = cn[:, fenetre:] - cn[:, :-fenetre]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        moyenne = somme / n
+    moyenne[n < part_min * fenetre] = np.nan
+    return moyenne
+
+
+def statistiques_glissantes(df, fenetre):
+    """Statistiques glissantes par station (format long : NUM_POSTE, DEPARTEMENT, date, ...).
+
+    Pour chaque variable : ``<var>_moy`` ; pour les cumuls (RR1) : ``<var>_cumul``,
+    moyenne ramenée à la longueur de la fenêtre pour ne pas sous-estimer
+    les fenêtres incomplètes.
+    """
+    postes, jours, grilles = grille_journaliere(df)
+    out = pd.DataFrame({
+        "NUM_POSTE": np.repeat(postes.to_numpy(), len(jours)),
+        "date": np.tile(jours.to_numpy(), len(postes)),
+    })
+    for variable, grille in grilles.items():
+        moyenne = moyenne_glissante(grille, fenetre)
+        out[f"{variable}_moy"] = moyenne.ravel()
+        if variable in CUMULS:
+            out[f"{variable}_cumul"] = (moyenne * fenetre).ravel()
+
+    departements = df.drop_duplicates("NUM_POSTE").set_index("NUM_POSTE")["DEPARTEMENT"]
+    out.insert(1, "DEPARTEMENT", departements.reindex(out["NUM_POSTE"]).to_numpy())
+    return out.dropna(subset=[c for c in out.columns if c.endswith(("_moy", "_cumul"))], how="all")
+
+
+def par_departement(stats):
+    """Agrège les statistiques glissantes des stations par département (moyenne inter-stations)."""
+    colonnes = [c for c in stats.columns if c.endswith(("_moy", "_cumul"))]
+    return stats.groupby(["DEPARTEMENT", "date"], as_index=False)[colonnes].mean()
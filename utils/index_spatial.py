@@ -0,0 +1,72 @@
+import numpy as np
+import shapely
+from scipy.spatial import cKDTree
+
+RAYON_TERRE_KM = 6371.0
+
+
+def _cartesien(lat, lon):
+    # Coordonnées sur la sphère unité : la distance euclidienne (corde) est
+    # monotone avec la distance géodésique, le KD-tree reste exact
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+class IndexSpatial:
+    """Index construits une fois par processus pour les requêtes de clic / d'emprise.
+
+    - STRtree sur les polygones de ``load_shp()`` (point dans polygone, emprise)
+    - KD-tree sur les stations (plus proches voisins)
+    - STRtree sur les points stations (requêtes d'emprise rectangulaire)
+    """
+
+    def __init__(self, gdf, stations):
+        self.gdf = gdf.reset_index(drop=True)
+        self.stations = stations.reset_index(drop=True)
+        self.arbre_polygones = shapely.STRtree(self.gdf.geometry.values)
+        self.arbre_points = shapely.STRtree(shapely.points(self.stations["LON"], self.stations["LAT"]))
+        self.kdtree = cKDTree(_cartesien(self.stations["LAT"], self.stations["LON"]))
+
+    def polygone_au_point(self, lat, lon):
+        """Ligne du polygone contenant le point, ou None."""
+        idx = self.arbre_polygones.query(shapely.Point(lon, lat), predicate="intersects")
+        return self.gdf.iloc[idx[0]] if len(idx) else None
+
+    def stations_proches(self, lat, lon, k=3):
+        """Les ``k`` stations les plus proches, avec leur distance en km."""
+        k = min(k, len(self.stations))
+        corde, idx = self.kdtree.query(_cartesien([lat], [lon])[0], k=k)
+        proches = self.stations.iloc[np.atleast_1d(idx)].copy()
+        proches["distance_km"] = 2 * RAYON_TERRE_KM * np.arcsin(np.atleast_1d(corde) / 2)
+        return proches
+
+    def stations_dans_emprise(self, sud, ouest, nord, est):
+        idx = self.arbre_points.query(shapely.box(ouest, sud, est, nord), predicate="intersects")
+        return self.stations.iloc[np.sort(idx)]
+
+    def polygones_dans_emprise(self, sud, ouest, nord, est):
+        idx = self.arbre_polygones.query(shapely.box(ouest, sud, est, nord))
+        return self.gdf.iloc[np.sort(idx)]
+
+
+# =====================
+# VIEWPORT
+# =====================
+# Tolérance de simplification (degrés) selon le niveau de zoom Leaflet
+TOLERANCES = ((6, 0.01), (8, 0.003), (10, 0.001))
+MARGE_EMPRISE = 0.2     # l'emprise est élargie de 20 % pour anticiper les petits déplacements
+
+
+def tolerance_pour_zoom(zoom):
+    for zoom_max, tolerance in TOLERANCES:
+        if zoom <= zoom_max:
+            return tolerance
+    return 0.0
+
+
+def emprise_elargie(bounds, marge=MARGE_EMPRISE):
+    """(sud, ouest, nord, est) à partir des ``bounds`` renvoyés par st_folium."""
+    sud, ouest = bounds["_southWest"]["lat"], bounds["_southWest"]["lng"]
+    nord, est = bounds["_northEast"]["lat"], bounds["_northEast"]["lng"]
+    dlat, dlon = (nord - sud) * marge, (est - ouest) * marge
+    return sud - dlat, ouest - dlon, nord + dlat, est + dlon
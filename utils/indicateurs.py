@@ -0,0 +1,52 @@
+# =====================
+# INDICATEURS DU DASHBOARD
+# =====================
+# Mêmes formules pour les pages et pour l'API (serveur_api.py) : le cumul
+# de précipitations est toujours la moyenne, sur les stations, de leur
+# cumul sur la période.
+
+
+def cumul_par_station(df, cles=()):
+    """Cumul RR1 moyen par station, éventuellement par groupe."""
+    cles = list(cles)
+    cumuls = df.groupby(cles + ["NUM_POSTE"])["RR1"].sum()
+    return cumuls.groupby(cles).mean() if cles else cumuls.mean()
+
+
+def kpis(df):
+    """Indicateurs de synthèse d'une sélection (bandeau de la page Carte)."""
+    return {
+        "observations": int(len(df)),
+        "stations": int(df["NUM_POSTE"].nunique()),
+        "T_moy": df["T"].mean(),
+        "T_min": df["T"].min(),
+        "T_max": df["T"].max(),
+        "U_moy": df["U"].mean(),
+        "U_max": df["U"].max(),
+        "RR1_cumul_station": cumul_par_station(df),
+        "PMER_moy": df["PMER"].mean(),
+        "PMER_min": df["PMER"].min(),
+        "FF_moy": df["FF"].mean(),
+        "FF_max": df["FF"].max(),
+    }
+
+
+def serie(df, cles):
+    """T et U moyennes, cumul RR1 moyen par station, par groupe (ex. ["annee"], ["mois"])."""
+    return (
+        df.groupby(cles)
+        .agg(T=("T", "mean"), U=("U", "mean"))
+        .assign(RR1=cumul_par_station(df, cles))
+        .reset_index()
+    )
+
+
+def comparaison(df):
+    """Tableau comparatif par département (page Comparaison)."""
+    return (
+        df.groupby("DEPARTEMENT")
+        .agg(T_moy=("T", "mean"), T_max=("T", "max"), T_min=("T", "min"),
+             U_moy=("U", "mean"), FF_moy=("FF", "mean"), PMER_moy=("PMER", "mean"))
+        .assign(RR1_cumul_station=cumul_par_station(df, ["DEPARTEMENT"]))
+        .reset_index()
+    )
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# =====================
+# PARAMÈTRES
+# =====================
+SEUIL_COMPLETUDE = 0.9      # part minimale de jours observés pour qu'un mois de station soit « complet »
+VARIABLES_COMPLETUDE = ["T", "RR1"]     # mesures dont dépendent les moyennes et cumuls des pages
+SAUTS_MAX = {"T": 12.0, "U": 50.0, "FF": 12.0}      # variation d'un jour à l'autre jugée aberrante
+BLOCAGE_MIN = 5             # jours consécutifs de valeur identique : capteur bloqué
+VARIABLES_BLOCAGE = ["T", "U"]      # RR1 / FF : valeurs répétées (0) normales
+CLES = ["NUM_POSTE", "annee", "mois"]
+
+
+# =====================
+# CONTRÔLE QUALITÉ (vectorisé, à l'ingestion)
+# =====================
+# Une passe sur les observations triées par (station, date) produit un
+# index compact, une ligne par (station, année, mois) :
+# - taux de jours renseignés par variable (jours attendus = jours du mois) ;
+# - plus longue lacune (jours sans observation) ;
+# - nombre de sauts aberrants et de jours de capteur bloqué ;
+# - ``complet`` : taux >= SEUIL_COMPLETUDE pour VARIABLES_COMPLETUDE.
+# Exclure les stations incomplètes revient ensuite à un filtre sur cet
+# index, sans rescanner les observations.
+
+
+def _lacunes(dates, meme_poste):
+    """Jours manquants juste avant chaque observation (0 en début de station)."""
+    ecart = np.diff(dates, prepend=dates[:1]).astype("timedelta64[D]").astype(np.int64) - 1
+    return np.where(meme_poste, np.maximum(ecart, 0), 0)
+
+
+def _sauts(df, meme_poste, veille):
+    """Nombre de variables en saut aberrant par rapport à la veille, par observation."""
+    sauts = np.zeros(len(df), dtype=np.int64)
+    for variable, seuil in SAUTS_MAX.items():
+        ecart = np.abs(df[variable].diff().to_numpy())
+        sauts += meme_poste & veille & (ecart > seuil)
+    return sauts
+
+
+def _blocages(df, meme_poste, veille):
+    """Nombre de variables bloquées (série de BLOCAGE_MIN valeurs identiques), par observation."""
+    blocages = np.zeros(len(df), dtype=np.int64)
+    for variable in VARIABLES_BLOCAGE:
+        x = df[variable].to_numpy()
+        identique = meme_poste & veille & (x == np.roll(x, 1))
+        serie = np.cumsum(~identique)       # identifiant de chaque série de valeurs identiques
+        longueur = np.bincount(serie)[serie]
+        blocages += (longueur >= BLOCAGE_MIN) & ~np.isnan(x)
+    return blocages
+
+
+def controler(df):
+    """Index de complétude et d'anomalies, une ligne par (station, année, mois)."""
+    df = df.sort_values(["NUM_POSTE", "date"], ignore_index=True)
+    postes = df["NUM_POSTE"].to_numpy()
+    dates = df["date"].to_numpy()
+    meme_poste = np.r_[False, postes[1:] == postes[:-1]]
+    lacune = _lacunes(dates, meme_poste)
+    veille = lacune == 0
+
+    indicateurs = df[CLES].assign(
+        lacune=lacune,
+        sauts=_sauts(df, meme_poste, veille),
+        bloques=_blocages(df, meme_poste, veille),
+        **{f"n_{v}": df[v].notna() for v in VARIABLES_COMPLETUDE + ["U", "FF"]},
+    )
+    index = indicateurs.groupby(CLES).agg(
+        jours=("lacune", "size"),
+        lacune_max=("lacune", "max"),
+        sauts=("sauts", "sum"),
+        bloques=("bloques", "sum"),
+        **{f"taux_{v}": (f"n_{v}", "sum") for v in VARIABLES_COMPLETUDE + ["U", "FF"]},
+    ).reset_index()
+
+    attendus = pd.to_datetime(dict(year=index["annee"], month=index["mois"], day=1)).dt.days_in_month
+    for colonne in [c for c in index.columns if c.startswith("taux_")]:
+        index[colonne] = (index[colonne] / attendus).round(3).astype(np.float32)
+    index["complet"] = (index[[f"taux_{v}" for v in VARIABLES_COMPLETUDE]] >= SEUIL_COMPLETUDE).all(axis=1)
+    return index.astype({"jours": np.int16, "lacune_max": np.int16, "sauts": np.int16, "bloques": np.int16})
+
+
+def cellules_completes(index, cles=CLES):
+    """Cellules complètes à la maille ``cles`` : (station, année, mois), ou (station, année).
+
+    Une année de station est complète si tous les mois couverts par les
+    données cette année-là sont présents et complets.
+    """
+    if "mois" in cles:
+        return index.loc[index["complet"], cles]
+    complets = index[index["complet"]].groupby(cles).size()
+    attendus = index.groupby("annee")["mois"].nunique()
+    complets = complets[complets.to_numpy() == attendus.reindex(complets.index.get_level_values("annee")).to_numpy()]
+    return complets.index.to_frame(index=False)
+
+
+def exclure_incompletes(df, index, cles=CLES):
+    """Observations de ``df`` appartenant à une cellule complète (voir ``cellules_completes``)."""
+    completes = pd.MultiIndex.from_frame(cellules_completes(index, cles))
+    return df[pd.MultiIndex.from_frame(df[cles]).isin(completes)]
@@ -0,0 +1,50 @@
+import numpy as np
+
+# =====================
+# INDEX PAR STATION
+# =====================
+# Les observations sont triées une fois par (station, date) : la série
+# complète d'une station est alors une tranche contiguë [debut, fin).
+# L'index d'origine des lignes est conservé (complétion de colonnes).
+COLONNES_CATALOGUE = ["NUM_POSTE", "NOM_USUEL", "DEPARTEMENT", "LAT", "LON", "ALTI", "date"]
+
+
+def indexer(df):
+    """Trie les observations par station et date, et calcule les bornes de chaque station."""
+    df_trie = df.sort_values(["NUM_POSTE", "date"])
+    postes, debuts = np.unique(df_trie["NUM_POSTE"].to_numpy(), return_index=True)
+    fins = np.r_[debuts[1:], len(df_trie)]
+    bornes = dict(zip(postes.tolist(), zip(debuts.tolist(), fins.tolist())))
+    return df_trie, bornes
+
+
+def serie_station(df_trie, bornes, poste):
+    """Série complète d'une station, par simple découpage (sans filtre booléen)."""
+    debut, fin = bornes[poste]
+    return df_trie.iloc[debut:fin]
+
+
+def catalogue(df):
+    """Une ligne par station : identité, position et période couverte."""
+    return (
+        df.groupby("NUM_POSTE")
+        .agg(
+            NOM_USUEL=("NOM_USUEL", "first"),
+            DEPARTEMENT=("DEPARTEMENT", "first"),
+            LAT=("LAT", "first"),
+            LON=("LON", "first"),
+            ALTI=("ALTI", "first"),
+            debut=("date", "min"),
+            fin=("date", "max"),
+            observations=("date", "size"),
+        )
+        .reset_index()
+    )
+
+
+def agregats(df):
+    """Indicateurs par station sur toute la période (attributs des couches cartographiques)."""
+    cumul_annuel = df.groupby(["NUM_POSTE", "annee"])["RR1"].sum().groupby("NUM_POSTE").mean()
+    out = df.groupby("NUM_POSTE").agg(T_moy=("T", "mean"), U_moy=("U", "mean"))
+    out["RR1_an"] = cumul_annuel
+    return out.round(1).reset_index()
@@ -0,0 +1,74 @@
+import json
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# =====================
+# PARAMÈTRES D'ÉCRITURE DU FICHIER NETTOYÉ
+# =====================
+# - colonnes d'identité (constantes par station) et année / mois :
+#   encodage dictionnaire ;
+# - date : encodage delta (pas constant d'un jour dans chaque station) ;
+# - mesures : entiers quantifiés (valeur × facteur, en int16), facteurs
+#   gardés dans les métadonnées du fichier et appliqués à la lecture ;
+#   encodage delta (écarts d'un jour à l'autre, petits dans une station) ;
+# - un groupe de lignes par année (filtre principal des pages), trié par
+#   station puis date ; statistiques min / max pour l'élagage.
+# Les mesures fournies au dixième (TX, TN, RR1, FXI) sont conservées
+# exactement ; les moyennes journalières (T, U, FF, N...) sont arrondies
+# au centième (au dixième pour DD et PMER, limite de l'int16).
+DICTIONNAIRE = ["NUM_POSTE", "DEPARTEMENT", "NOM_USUEL", "LAT", "LON", "ALTI", "annee", "mois"]
+QUANTIFICATION = {
+    "T": 100, "TX": 10, "TN": 10, "RR1": 10, "U": 100, "FF": 100,
+    "DD": 10, "PMER": 10, "N": 100, "FXI": 10,
+}
+DELTA = ["date", *QUANTIFICATION]
+TRI = ["annee", "NUM_POSTE", "date"]
+GROUPE = "annee"
+COMPRESSION = "zstd"
+CLE_META = b"quantification"
+
+
+def _quantifier(table):
+    for colonne, facteur in QUANTIFICATION.items():
+        if colonne in table.column_names:
+            valeurs = pc.round(pc.multiply(table[colonne], facteur))
+            i = table.column_names.index(colonne)
+            table = table.set_column(i, colonne, valeurs.cast(pa.int16()))
+    return table
+
+
+def ecrire(df, chemin):
+    """Écrit les observations nettoyées avec les encodages ci-dessus."""
+    table = pa.Table.from_pandas(df.sort_values(TRI, ignore_index=True), preserve_index=False)
+    table = _quantifier(table)
+    facteurs = {c: f for c, f in QUANTIFICATION.items() if c in table.column_names}
+    table = table.replace_schema_metadata({**table.schema.metadata, CLE_META: json.dumps(facteurs).encode()})
+
+    options = {
+        "compression": COMPRESSION,
+        "use_dictionary": [c for c in DICTIONNAIRE if c in table.column_names],
+        "column_encoding": {c: "DELTA_BINARY_PACKED" for c in DELTA if c in table.column_names},
+    }
+    groupes = pc.unique(table[GROUPE]).to_pylist()
+    with pq.ParquetWriter(chemin, table.schema, **options) as ecrivain:
+        for valeur in groupes:
+            # Une écriture par année : un groupe de lignes par année
+            groupe = table.filter(pc.equal(table[GROUPE], valeur))
+            ecrivain.write_table(groupe, row_group_size=groupe.num_rows)
+
+
+def lire(chemin, colonnes=None, filtres=None):
+    """Lit un fichier écrit par ``ecrire`` (ou un Parquet ordinaire) en DataFrame pandas.
+
+    Les mesures quantifiées sont reconverties en flottants.
+    """
+    table = pq.read_table(chemin, columns=colonnes, filters=filtres)
+    meta = table.schema.metadata or {}
+    if CLE_META in meta:
+        for colonne, facteur in json.loads(meta[CLE_META]).items():
+            if colonne in table.column_names:
+                valeurs = pc.divide(table[colonne].cast(pa.float64()), float(facteur))
+                table = table.set_column(table.column_names.index(colonne), colonne, valeurs)
+    return table.to_pandas()
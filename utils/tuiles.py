@@ -0,0 +1,183 @@
+import math
+import os
+import shutil
+import tempfile
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# =====================
+# PARAMÈTRES
+# =====================
+TILES_DIR = "data/tiles"
+ZOOMS = range(5, 13)        # au-delà, le client sur-zoome la dernière tuile (maxNativeZoom)
+EXTENT = 4096               # résolution interne d'une tuile MVT
+TAMPON = 64                 # marge autour de la tuile (unités de tuile) contre les coutures
+PORT = 8765
+TILES_URL = os.environ.get("TILES_URL", f"http://localhost:{PORT}/{{z}}/{{x}}/{{y}}.pbf")
+ORIGINE = 20037508.342789244    # demi-étendue Web Mercator (m)
+
+
+# =====================
+# GÉOMÉTRIE DES TUILES (Web Mercator, schéma XYZ)
+# =====================
+def bornes_tuile(z, x, y):
+    """(ouest, sud, est, nord) d'une tuile en EPSG:3857."""
+    taille = 2 * ORIGINE / 2 ** z
+    ouest = -ORIGINE + x * taille
+    nord = ORIGINE - y * taille
+    return ouest, nord - taille, ouest + taille, nord
+
+
+def tuiles_couvrantes(bounds, z):
+    """Indices (x, y) des tuiles de niveau ``z`` couvrant une emprise EPSG:3857."""
+    taille = 2 * ORIGINE / 2 ** z
+    minx, miny, maxx, maxy = bounds
+    x0, x1 = int((minx + ORIGINE) // taille), int((maxx + ORIGINE) // taille)
+    y0, y1 = int((ORIGINE - maxy) // taille), int((ORIGINE - miny) // taille)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+# =====================
+# GÉNÉRATION
+# =====================
+def _proprietes(ligne, colonnes):
+    props = {}
+    for col in colonnes:
+        valeur = ligne[col]
+        if valeur is None or (isinstance(valeur, float) and math.isnan(valeur)):
+            continue
+        props[col] = valeur.item() if hasattr(valeur, "item") else valeur
+    return props
+
+
+def generer_tuiles(couches, dossier=TILES_DIR, zooms=ZOOMS):
+    """Écrit une pyramide de tuiles MVT ``dossier/z/x/y.pbf``.
+
+    ``couches`` associe un nom de couche à un GeoDataFrame en EPSG:3857 ;
+    toutes ses colonnes non géométriques deviennent des attributs.
+    Les géométries sont découpées à la tuile (avec tampon) et simplifiées
+    à la résolution du niveau de zoom. Retourne le nombre de tuiles écrites.
+
+    La pyramide est écrite dans un dossier temporaire puis remplace
+    ``dossier`` d'un bloc : aucune tuile d'une génération précédente
+    (autres données, autres zooms) ne reste servie.
+    """
+    import mapbox_vector_tile
+    import shapely
+
+    arbres = {nom: shapely.STRtree(gdf.geometry.values) for nom, gdf in couches.items()}
+    emprise = shapely.union_all([shapely.box(*gdf.total_bounds) for gdf in couches.values()]).bounds
+    parent = os.path.dirname(os.path.abspath(dossier))
+    os.makedirs(parent, exist_ok=True)
+    dossier_final, dossier = dossier, tempfile.mkdtemp(prefix=".tuiles-", dir=parent)
+    os.chmod(dossier, 0o755)        # mkdtemp : 0700, le dossier doit rester lisible par le serveur
+    ecrites = 0
+    for z in zooms:
+        for x, y in tuiles_couvrantes(emprise, z):
+            ouest, sud, est, nord = bornes_tuile(z, x, y)
+            marge = (est - ouest) * TAMPON / EXTENT
+            cadre = shapely.box(ouest - marge, sud - marge, est + marge, nord + marge)
+            tolerance = (est - ouest) / EXTENT
+
+            layers = []
+            for nom, gdf in couches.items():
+                idx = arbres[nom].query(cadre, predicate="intersects")
+                if len(idx) == 0:
+                    continue
+                sel = gdf.iloc[idx]
+                colonnes = [c for c in sel.columns if c != sel.geometry.name]
+                geometries = shapely.clip_by_rect(sel.geometry.values, *cadre.bounds)
+                geometries = shapely.simplify(geometries, tolerance, preserve_topology=True)
+                features = [
+                    {"geometry": geom, "properties": _proprietes(ligne, colonnes)}
+                    for geom, (_, ligne) in zip(geometries, sel.iterrows())
+                    if not geom.is_empty
+                ]
+                if features:
+                    layers.append({"name": nom, "features": features})
+            if not layers:
+                continue
+
+            tuile = mapbox_vector_tile.encode(
+                layers,
+                default_options={"quantize_bounds": (ouest, sud, est, nord), "extents": EXTENT},
+            )
+            chemin = os.path.join(dossier, str(z), str(x), f"{y}.pbf")
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+            with open(chemin, "wb") as f:
+                f.write(tuile)
+            ecrites += 1
+
+    ancien = None
+    if os.path.exists(dossier_final):
+        ancien = tempfile.mkdtemp(prefix=".tuiles-anciennes-", dir=parent)
+        os.replace(dossier_final, os.path.join(ancien, "tuiles"))
+    os.replace(dossier, dossier_final)
+    if ancien:
+        shutil.rmtree(ancien)
+    return ecrites
+
+
+# =====================
+# STYLE CÔTÉ CLIENT (Leaflet.VectorGrid)
+# =====================
+def options_vectorgrid(departement="Tous", postes=None):
+    """Options JS de ``VectorGridProtobuf`` ; hors département sélectionné, les entités sont masquées.
+
+    ``postes`` : None pour les contours seuls (carte de base), sinon les
+    NUM_POSTE des stations à afficher (couche stations seule) : les tuiles
+    contiennent toutes les stations, le filtre de période et de complétude
+    est appliqué côté client.
+    """
+    filtre = "true" if departement == "Tous" else f"Number(p.dep ?? p.DEPARTEMENT) === {int(departement)}"
+    contours = "true" if postes is None else "false"
+    visibles = ", ".join(str(int(poste)) for poste in (postes if postes is not None else []))
+    return f"""{{
+        "maxNativeZoom": {max(ZOOMS)},
+        "interactive": true,
+        "getFeatureId": function(f) {{ return f.properties.NUM_POSTE || f.properties.nom || f.properties.dep; }},
+        "vectorTileLayerStyles": {{
+            "communes": function(p) {{
+                return {contours} && {filtre} ? {{"color": "#00d2ff", "weight": 0.5, "opacity": 0.4, "fill": false}} : [];
+            }},
+            "departements": function(p) {{
+                return {contours} && {filtre} ? {{"color": "#00d2ff", "weight": 2, "fill": true, "fillColor": "#00d2ff", "fillOpacity": 0.08}} : [];
+            }},
+            "stations": (function(postes) {{
+                return function(p) {{
+                    return postes.has(Number(p.NUM_POSTE)) && {filtre} ? {{"radius": 5, "color": "#00d2ff", "weight": 2, "fill": true, "fillColor": "#00d2ff", "fillOpacity": 0.7}} : [];
+                }};
+            }})(new Set([{visibles}]))
+        }}
+    }}"""
+
+
+# =====================
+# SERVEUR LOCAL
+# =====================
+class _GestionnaireTuiles(SimpleHTTPRequestHandler):
+    extensions_map = {".pbf": "application/x-protobuf"}
+
+    def end_headers(self):
+        # La carte Streamlit est servie depuis une autre origine
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Cache-Control", "public, max-age=86400")
+        super().end_headers()
+
+    def send_error(self, code, message=None, explain=None):
+        # Tuile absente = zone vide : réponse vide plutôt qu'une erreur
+        if code == 404 and self.path.endswith(".pbf"):
+            self.send_response(204)
+            self.end_headers()
+            return
+        super().send_error(code, message, explain)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def servir(dossier=TILES_DIR, port=PORT):
+    """Sert la pyramide de tuiles sur http://localhost:<port>/{z}/{x}/{y}.pbf."""
+    serveur = ThreadingHTTPServer(("", port), partial(_GestionnaireTuiles, directory=dossier))
+    print(f"🧩 Tuiles servies sur http://localhost:{port}/{{z}}/{{x}}/{{y}}.pbf")
+    serveur.serve_forever()
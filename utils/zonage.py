@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from utils.indicateurs import serie
+
+# =====================
+# PARAMÈTRES
+# =====================
+CRS_METRIQUE = "EPSG:2154"  # Lambert-93 : distances en mètres
+DISTANCE_MAX = 2000         # stations côtières hors polygone : rattachées au plus proche à moins de 2 km
+HORS_ZONE = -1
+
+
+# =====================
+# AFFECTATION STATION → ZONE
+# =====================
+# Chaque zonage (communes, départements, EPCI, zones climatiques...) est une
+# couche de polygones avec une colonne clé (entière, ou code comme l'INSEE
+# des communes). La jointure spatiale est
+# faite une fois, à la construction ; ensuite, agréger par zone revient à un
+# groupby sur cette clé.
+
+
+def affecter(points, gdf, cle, distance_max=DISTANCE_MAX):
+    """Clé du polygone contenant chaque point (jointure spatiale vectorisée), HORS_ZONE sinon.
+
+    Clés entières en int32 ; clés textuelles (codes) en chaînes, ``str(HORS_ZONE)`` hors zone.
+    """
+    import geopandas as gpd
+
+    polygones = gdf[[cle, gdf.geometry.name]].to_crs(points.crs)
+    joint = gpd.sjoin(points, polygones, how="left", predicate="within")
+    cles = joint.loc[~joint.index.duplicated(), cle]     # point sur une frontière : premier polygone
+
+    manquants = cles.isna()
+    if manquants.any():
+        proches = gpd.sjoin_nearest(
+            points[manquants].to_crs(CRS_METRIQUE),
+            polygones.to_crs(CRS_METRIQUE),
+            max_distance=distance_max,
+        )
+        cles = cles.fillna(proches.loc[~proches.index.duplicated(), cle])
+    if pd.api.types.is_numeric_dtype(gdf[cle]):
+        return cles.fillna(HORS_ZONE).astype(np.int32)
+    return cles.fillna(str(HORS_ZONE)).astype(str)
+
+
+def table_affectation(catalogue, couches):
+    """Une ligne par station : NUM_POSTE, DEPARTEMENT (fichier source) et une clé par zonage.
+
+    ``couches`` associe un nom de zonage à ``(GeoDataFrame, colonne clé)``.
+    """
+    import geopandas as gpd
+
+    points = gpd.GeoDataFrame(
+        catalogue[["NUM_POSTE"]],
+        geometry=gpd.points_from_xy(catalogue["LON"], catalogue["LAT"]),
+        crs="EPSG:4326",
+    )
+    table = catalogue[["NUM_POSTE", "DEPARTEMENT"]].reset_index(drop=True)
+    for nom, (gdf, cle) in couches.items():
+        table[nom] = affecter(points, gdf, cle).to_numpy()
+    return table
+
+
+def centroides_emprises(gdf, cle):
+    """Par valeur de ``cle`` : centroïde calculé en Lambert-93 (ramené en lat / lon)
+    et emprise lat / lon (sud, ouest, nord, est) de la géométrie."""
+    centres = gdf.geometry.to_crs(CRS_METRIQUE).centroid.to_crs(gdf.crs)
+    bornes = gdf.geometry.bounds
+    return pd.DataFrame({
+        cle: gdf[cle].to_numpy(),
+        "centre_lat": centres.y.to_numpy(),
+        "centre_lon": centres.x.to_numpy(),
+        "sud": bornes["miny"].to_numpy(),
+        "ouest": bornes["minx"].to_numpy(),
+        "nord": bornes["maxy"].to_numpy(),
+        "est": bornes["maxx"].to_numpy(),
+    })
+
+
+def agreger(df, affectation, zonage, **agregations):
+    """Agrège ``df`` (une colonne NUM_POSTE) par zone, via la table d'affectation."""
+    cles = affectation.set_index("NUM_POSTE")[zonage]
+    out = df.groupby(df["NUM_POSTE"].map(cles).rename(zonage)).agg(**agregations)
+    return out.drop(HORS_ZONE, errors="ignore")
+
+
+# =====================
+# AGRÉGATS PAR ZONE ET PAR PÉRIODE
+# =====================
+TOUS_MOIS = 0       # mois = 0 : agrégat sur l'année entière
+
+
+def agregats_par_zone(df, affectation, zonage):
+    """Table (zone, annee, mois) → T moyenne, cumul RR1 moyen par station, U moyenne.
+
+    Calculée une fois depuis les observations, pour chaque mois et pour
+    l'année entière (``mois = TOUS_MOIS``) : la carte ne fait plus qu'une
+    lecture par clé.
+    """
+    df = df.assign(**{zonage: df["NUM_POSTE"].map(affectation.set_index("NUM_POSTE")[zonage])})
+    df = df[~df[zonage].isin([HORS_ZONE, str(HORS_ZONE)])]
+    tables = [serie(df, [zonage, "annee", "mois"]), serie(df, [zonage, "annee"]).assign(mois=TOUS_MOIS)]
+    return pd.concat(tables, ignore_index=True).astype({"annee": int, "mois": int}).round(2)